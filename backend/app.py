@@ -24,6 +24,8 @@ def create_app():
     _register_error_handlers(app)
     _register_hooks(app)
     _register_health_check(app)
+    _warm_templates(app)
+    _warm_result_backend(app)
 
     return app
 
@@ -43,6 +45,9 @@ def _configure_logging(app):
 # ─── Extensions ───────────────────────────────────────────────────────────────
 
 def _init_extensions(app):
+    from utils.response import OrjsonProvider, orjson
+    if orjson:
+        app.json = OrjsonProvider(app)
     db.init_app(app)
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
@@ -170,6 +175,42 @@ def _register_health_check(app):
         })
 
 
+# ─── Template warm-up ─────────────────────────────────────────────────────────
+
+# Every admin and client page template is compiled once at startup so no
+# worker's first request per page pays for the loader walk + Jinja compile.
+WARM_TEMPLATE_DIRS = ("admin/", "client/")
+
+
+def _warm_templates(app):
+    cache_dir = app.config.get("JINJA_CACHE_DIR")
+    if cache_dir:
+        # Compiled bytecode persists on disk, so restarted workers skip the
+        # parse + compile step as well (sources are still stat'ed for changes).
+        from jinja2 import FileSystemBytecodeCache
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    names = app.jinja_env.list_templates(
+        filter_func=lambda n: n.endswith(".html") and n.startswith(WARM_TEMPLATE_DIRS)
+    )
+    for name in names:
+        app.jinja_env.get_template(name)
+    app.logger.debug(f"Warmed {len(names)} templates.")
+
+
+# ─── Celery result backend ────────────────────────────────────────────────────
+
+def _warm_result_backend(app):
+    # Build the shared Celery result backend now rather than inside the first
+    # /api/ocr/status poll. Redis connects lazily, so this never blocks startup.
+    try:
+        from tasks.celery_app import celery
+        celery.backend
+    except Exception as e:     # Celery not installed — OCR runs inline
+        app.logger.debug(f"Celery result backend not initialised: {e}")
+
+
 # ─── Entry point ──────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
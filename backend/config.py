@@ -56,10 +56,21 @@ class Config:
     ALLOWED_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "pdf"}
     ALLOWED_DOCUMENT_EXTENSIONS = {"pdf", "doc", "docx", "jpg", "jpeg", "png"}
     ALLOWED_AUDIO_EXTENSIONS = {"mp3", "mp4", "wav", "ogg", "webm", "m4a", "ogg"}
+    # Let the fronting web server ship files named by an X-Sendfile header
+    # (Apache mod_xsendfile, lighttpd). Only enable behind such a server.
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "false").lower() == "true"
+    # nginx: internal location aliasing UPLOAD_FOLDER (e.g. /protected-uploads);
+    # ID image previews then return only an X-Accel-Redirect header. Empty = off.
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get("X_ACCEL_REDIRECT_PREFIX", "")
 
     # Security
     TOKEN_EXPIRY_DAYS = int(os.environ.get("TOKEN_EXPIRY_DAYS", 30))
     ENCRYPTION_KEY = os.environ.get("ENCRYPTION_KEY", "").encode() or None
+    # false = no AuditLogs rows from any writer (client portal, admin, auth)
+    AUDIT_ENABLED = os.environ.get("AUDIT_ENABLED", "true").lower() != "false"
+
+    # Templates — on-disk Jinja bytecode cache shared by workers (empty = off)
+    JINJA_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR", "")
 
     # Session
     SESSION_TYPE = "redis"
@@ -72,6 +83,8 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False   # templates are warmed at startup; skip per-render mtime checks
+    JINJA_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR", "/tmp/itifaq_jinja_cache")
 
 
 config_map = {
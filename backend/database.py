@@ -1,8 +1,10 @@
 import os
+from contextlib import contextmanager
 import psycopg2
 import psycopg2.extras
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import text
+from sqlalchemy.orm import scoped_session
 
 db = SQLAlchemy()
 
@@ -29,6 +31,22 @@ def _enable_pgvector(app):
             print(f"[DB] Warning: could not enable pgvector extension: {e}")
 
 
+@contextmanager
+def no_expire_on_commit(session):
+    """
+    Keep loaded attributes valid across commit() inside the block, so a route
+    that serialises an object right after committing it doesn't re-SELECT it.
+    """
+    if isinstance(session, scoped_session):
+        session = session()          # the flag lives on the real Session
+    prev = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield session
+    finally:
+        session.expire_on_commit = prev
+
+
 def get_raw_connection():
     """
     Return a raw psycopg2 connection for operations that need
@@ -0,0 +1,31 @@
+"""
+gunicorn.conf.py — Production server settings.
+
+Threaded workers (gthread): a long document download or ZIP stream holds one
+thread, not a whole worker, so API requests keep being served alongside it.
+File responses go through wsgi.file_wrapper, which gunicorn sends with
+sendfile(2) — the copy happens in the kernel and releases the GIL.
+
+GUNICORN_WORKER_CLASS=gevent is for webhook-heavy deployments: each worker
+then holds up to GUNICORN_WORKER_CONNECTIONS requests that mostly wait on
+Twilio or Postgres. gunicorn monkey-patches the stdlib itself; psycopg2 is
+not green-aware, so post_fork makes it yield via psycogreen (required).
+"""
+
+import os
+
+bind               = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers            = int(os.environ.get("GUNICORN_WORKERS", 2 * (os.cpu_count() or 1) + 1))
+worker_class       = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads            = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))   # gevent only
+timeout            = 120        # large ZIP downloads stream for a while
+keepalive          = 5
+accesslog          = "-"
+
+
+def post_fork(server, worker):
+    if worker_class != "gevent":
+        return
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -9,10 +9,12 @@ from datetime import datetime, timezone
 from database import db
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, DateTime,
-    ForeignKey, Numeric, ARRAY, Enum as PgEnum, Index
+    ForeignKey, Numeric, ARRAY, Enum as PgEnum, Index, LargeBinary, true
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
+import os
+import time
 import uuid
 import enum
 
@@ -107,6 +109,25 @@ def new_uuid():
     return str(uuid.uuid4())
 
 
+def new_uuid7():
+    """
+    Time-ordered UUID (v7 layout: 48-bit ms timestamp + 74 random bits) as a
+    36-char string. Fits the existing String(36) PKs; because the prefix grows
+    with time, inserts land at the right edge of the B-tree instead of at
+    random pages. Used for append-heavy tables (audit_logs).
+    """
+    ms   = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                         # version
+        | (rand >> 68) << 64                # rand_a (12 bits)
+        | 0b10 << 62                        # RFC 4122 variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF      # rand_b (62 bits)
+    )
+    return str(uuid.UUID(int=value))
+
+
 # ─────────────────────────────────────────────
 # 1. LawFirms
 # ─────────────────────────────────────────────
@@ -168,6 +189,7 @@ class Client(db.Model):
     firm_id = Column(String(36), ForeignKey("law_firms.firm_id", ondelete="CASCADE"), nullable=False)
     reference_id = Column(String(30), unique=True, nullable=False)   # e.g. ITF-2026-04821
     portal_token = Column(String(128), unique=True, nullable=False)
+    portal_token_hash = Column(LargeBinary(32), nullable=True)        # sha256(portal_token), lookup key
     full_name = Column(String(255), nullable=False)
     email = Column(String(255), nullable=True)
     phone = Column(String(30), nullable=True)
@@ -196,12 +218,19 @@ class Client(db.Model):
     engagement_letters = relationship("EngagementLetter", back_populates="client", cascade="all, delete-orphan")
     kyc_records        = relationship("KYCRecord",        back_populates="client", cascade="all, delete-orphan")
     calendly_bookings  = relationship("CalendlyBooking",  back_populates="client", cascade="all, delete-orphan")
+    requested_documents = relationship("RequestedDocument", back_populates="client", cascade="all, delete-orphan",
+                                       order_by="RequestedDocument.created_at")
 
     __table_args__ = (
         Index("ix_clients_firm_id", "firm_id"),
         Index("ix_clients_reference_id", "reference_id"),
-        Index("ix_clients_portal_token", "portal_token"),
+        # Token lookups go by hash; INCLUDE lets the preview ownership check
+        # (client_id, token_expires_at) run as an index-only scan
+        Index("ix_clients_portal_token_hash", "portal_token_hash", unique=True,
+              postgresql_include=["client_id", "token_expires_at"]),
         Index("ix_clients_status", "status"),
+        # Every WhatsApp webhook finds its client by (phone, channel)
+        Index("ix_clients_phone_channel", "phone", "channel"),
     )
 
     def __repr__(self):
@@ -223,12 +252,15 @@ class Passport(db.Model):
     expiry_date = Column(String(20), nullable=True)
     image_path = Column(String(512), nullable=False)
     ocr_raw = Column(JSONB, nullable=True)               # raw PaddleOCR output
+    conflict_payload = Column(JSONB, nullable=True)      # normalise_ocr_output(), set with ocr_raw
+    content_sha256 = Column(String(64), nullable=True)   # upload dedup key
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
 
     client = relationship("Client", back_populates="passports")
 
     __table_args__ = (
         Index("ix_passports_client_id", "client_id"),
+        Index("ix_passports_client_sha256", "client_id", "content_sha256", unique=True),
     )
 
     def __repr__(self):
@@ -247,12 +279,15 @@ class EmiratesID(db.Model):
     id_number = Column(String(50), nullable=True)
     image_path = Column(String(512), nullable=False)
     ocr_raw = Column(JSONB, nullable=True)
+    conflict_payload = Column(JSONB, nullable=True)      # normalise_ocr_output(), set with ocr_raw
+    content_sha256 = Column(String(64), nullable=True)   # upload dedup key
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
 
     client = relationship("Client", back_populates="emirates_ids")
 
     __table_args__ = (
         Index("ix_emirates_ids_client_id", "client_id"),
+        Index("ix_emirates_ids_client_sha256", "client_id", "content_sha256", unique=True),
     )
 
     def __repr__(self):
@@ -274,12 +309,16 @@ class Statement(db.Model):
     client_edited_text = Column(Text, nullable=True)            # final confirmed version
     channel = Column(PgEnum(StatementChannel, name="statement_channel_enum"), nullable=False)
     flagged_for_review = Column(Boolean, default=False)
+    content_sha256 = Column(String(64), nullable=True)          # audio upload dedup key (NULL for text)
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
 
     client = relationship("Client", back_populates="statements")
 
     __table_args__ = (
         Index("ix_statements_client_id", "client_id"),
+        # WhatsApp confirm step: latest statement N of a client, one index seek
+        Index("ix_statements_client_seq", "client_id", "sequence_number", "created_at"),
+        Index("ix_statements_client_sha256", "client_id", "content_sha256", unique=True),
     )
 
     def __repr__(self):
@@ -305,12 +344,17 @@ class Document(db.Model):
     )
     uploaded_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
     requested_by_firm = Column(Boolean, default=False, nullable=False)
+    content_sha256 = Column(String(64), nullable=True)          # upload dedup key
+    is_present = Column(Boolean, default=True, server_default=true(), nullable=False)  # file on disk
+    verified_at = Column(DateTime(timezone=True), nullable=True)  # last presence sweep
 
     client = relationship("Client", back_populates="documents")
 
     __table_args__ = (
         Index("ix_documents_client_id", "client_id"),
         Index("ix_documents_file_type", "file_type"),
+        Index("ix_documents_client_sha256", "client_id", "content_sha256", unique=True),
+        Index("ix_documents_uploaded_at_id", "uploaded_at", "document_id"),   # keyset paging
     )
 
     def __repr__(self):
@@ -451,7 +495,7 @@ class ClientEdit(db.Model):
 class AuditLog(db.Model):
     __tablename__ = "audit_logs"
 
-    log_id = Column(String(36), primary_key=True, default=new_uuid)
+    log_id = Column(String(36), primary_key=True, default=new_uuid7)
     firm_id = Column(String(36), ForeignKey("law_firms.firm_id", ondelete="CASCADE"), nullable=False)
     action = Column(Text, nullable=False)
     performed_by = Column(String(36), ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True)
@@ -530,6 +574,8 @@ class RequestedDocument(db.Model):
     received_document_id = Column(String(36), ForeignKey("documents.document_id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
 
+    client = relationship("Client", back_populates="requested_documents")
+
     __table_args__ = (
         Index("ix_requested_documents_client_id", "client_id"),
         Index("ix_requested_documents_firm_id", "firm_id"),
@@ -15,10 +15,11 @@ from models import (
     ConflictResult, MatchType, ConflictDecision,
     ConflictIndex, AuditLog, AIBrief,
     RequestedDocument, EngagementLetter, User,
-    CalendlyBooking, KYCRecord,
+    CalendlyBooking, KYCRecord, new_uuid7,
 )
 from utils.response import success, error, not_found
 from utils.auth import login_required, admin_required, get_current_firm_id, get_current_user
+from utils.audit import first_in_request
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -895,10 +896,11 @@ def download_engagement_letter(client_id):
 @admin_bp.route("/clients/<client_id>/passport/<passport_id>/image")
 @login_required
 def serve_passport_image(client_id, passport_id):
-    """Serve a passport image for admin viewing."""
+    """Serve a passport image for admin viewing (via nginx when X-Accel is configured)."""
     import os
-    from flask import current_app, send_file
+    from flask import current_app
     from models import Passport
+    from routes.ocr import _serve_file_zero_copy
     firm_id = get_current_firm_id()
     client = Client.query.filter_by(client_id=client_id, firm_id=firm_id).first()
     if not client:
@@ -910,16 +912,17 @@ def serve_passport_image(client_id, passport_id):
     abs_path = os.path.abspath(os.path.join(upload_folder, p.image_path) if not os.path.isabs(p.image_path) else p.image_path)
     if not os.path.isfile(abs_path):
         return not_found("Image file")
-    return send_file(abs_path)
+    return _serve_file_zero_copy(abs_path)
 
 
 @admin_bp.route("/clients/<client_id>/emiratesid/<eid_id>/image")
 @login_required
 def serve_eid_image(client_id, eid_id):
-    """Serve an Emirates ID image for admin viewing."""
+    """Serve an Emirates ID image for admin viewing (via nginx when X-Accel is configured)."""
     import os
-    from flask import current_app, send_file
+    from flask import current_app
     from models import EmiratesID
+    from routes.ocr import _serve_file_zero_copy
     firm_id = get_current_firm_id()
     client = Client.query.filter_by(client_id=client_id, firm_id=firm_id).first()
     if not client:
@@ -931,7 +934,7 @@ def serve_eid_image(client_id, eid_id):
     abs_path = os.path.abspath(os.path.join(upload_folder, e.image_path) if not os.path.isabs(e.image_path) else e.image_path)
     if not os.path.isfile(abs_path):
         return not_found("Image file")
-    return send_file(abs_path)
+    return _serve_file_zero_copy(abs_path)
 
 
 @admin_bp.route("/clients/<client_id>/document/<document_id>/file")
@@ -1422,11 +1425,19 @@ def calendly_webhook():
 # ════════════════════════════════════════════════════════════
 
 def _write_audit(firm_id, performed_by, action, record_type=None, record_id=None):
-    import uuid as _uuid
+    """
+    Stage an AuditLogs row without flushing. The route's commit inserts it
+    together with the change it records; pending audit rows are batched into
+    one executemany INSERT by the unit of work.
+    """
     from flask import current_app
+    if not current_app.config.get("AUDIT_ENABLED", True):
+        return
+    if not first_in_request(firm_id, action, record_type, record_id):
+        return
     try:
         log = AuditLog(
-            log_id=str(_uuid.uuid4()),
+            log_id=new_uuid7(),
             firm_id=firm_id,
             action=action,
             performed_by=performed_by,
@@ -1434,6 +1445,5 @@ def _write_audit(firm_id, performed_by, action, record_type=None, record_id=None
             record_id=record_id,
         )
         db.session.add(log)
-        db.session.flush()
     except Exception as e:
         current_app.logger.warning(f"Audit log failed: {e}")
@@ -8,11 +8,26 @@ Current providers:
 """
 
 import os
-from flask import Blueprint
+import json
+from flask import Blueprint, current_app
 
 ai_bp = Blueprint("ai", __name__)
 
 
+# ── Lazy OpenAI client ────────────────────────────────────────────────────────
+_openai_client = None
+_openai_client_key = None
+
+def _get_openai_client(api_key: str):
+    """Return a shared OpenAI client so Whisper/embedding calls reuse one connection pool."""
+    global _openai_client, _openai_client_key
+    if _openai_client is None or _openai_client_key != api_key:
+        import openai
+        _openai_client = openai.OpenAI(api_key=api_key)
+        _openai_client_key = api_key
+    return _openai_client
+
+
 # ─── Speech-to-text ───────────────────────────────────────────────────────────
 
 def transcribe_audio(audio_file_path: str) -> str:
@@ -32,13 +47,11 @@ def transcribe_audio(audio_file_path: str) -> str:
         RuntimeError if transcription fails
     """
     try:
-        import openai
-        from flask import current_app
         api_key = current_app.config.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY not configured.")
 
-        client = openai.OpenAI(api_key=api_key)
+        client = _get_openai_client(api_key)
         with open(audio_file_path, "rb") as f:
             transcript = client.audio.transcriptions.create(
                 model="whisper-1",
@@ -68,10 +81,8 @@ def generate_brief(client_data: dict) -> dict:
     Returns:
         Dict with keys matching AIBrief model fields.
     """
-    import json as _json
     try:
         import anthropic
-        from flask import current_app
         api_key = current_app.config.get("ANTHROPIC_API_KEY")
         if not api_key:
             raise RuntimeError("ANTHROPIC_API_KEY not configured. Add it to your .env file.")
@@ -131,7 +142,7 @@ Produce a JSON object with exactly these fields:
             clean = clean.split("```")[1]
             if clean.startswith("json"):
                 clean = clean[4:]
-        parsed = _json.loads(clean.strip())
+        parsed = json.loads(clean.strip())
 
         return {
             "client_summary":       parsed.get("client_summary"),
@@ -166,12 +177,10 @@ def generate_embedding(text: str) -> list:
         RuntimeError if embedding generation fails
     """
     try:
-        import openai
-        from flask import current_app
         api_key = current_app.config.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY not configured.")
-        client = openai.OpenAI(api_key=api_key)
+        client = _get_openai_client(api_key)
         response = client.embeddings.create(
             model="text-embedding-3-small",
             input=text.strip(),
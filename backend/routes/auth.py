@@ -2,17 +2,49 @@
 auth_routes.py — Login, logout, and session management for admin/lawyer users.
 """
 
-from flask import Blueprint, request, session, redirect, url_for, render_template, current_app
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, session, redirect, url_for, render_template, current_app, g
 from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from database import db
-from models import User, LawFirm, AuditLog
+from models import User, UserRole, LawFirm, AuditLog, new_uuid7
 from utils.response import success, error, unauthorized
-from utils.auth import login_required, admin_required, get_current_user
+from utils.auth import login_required, admin_required, get_current_user, get_current_firm_id
+from utils.audit import first_in_request
 
 auth_bp = Blueprint("auth", __name__)
 
+# Hashes not produced with these parameters are upgraded on the next successful login
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+
+
+# ─── Audit buffer ─────────────────────────────────────────────────────────────
+# Audit rows are collected on flask.g during the request. Routes whose audit
+# row must be atomic with their own change (create_user) flush it into their
+# transaction; everything else is written off the request path by a small
+# background pool once the response is done.
+
+_audit_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audit")
+
+
+@auth_bp.before_request
+def _init_audit_buffer():
+    g.audit_buffer = []
+
+
+@auth_bp.teardown_request
+def _dispatch_audit_buffer(exc):
+    """Hand any audit rows the route did not flush to the background writer."""
+    if exc is not None:
+        return
+    rows = g.get("audit_buffer")
+    if rows:
+        _audit_executor.submit(_write_audit_rows, current_app._get_current_object(), list(rows))
+        rows.clear()
+
 
 # ─── Login ────────────────────────────────────────────────────────────────────
 
@@ -58,27 +90,36 @@ def login():
     if not email or not password:
         return error("Email and password are required.", 400)
 
-    # Look up user — must be active
-    user = User.query.filter_by(email=email, is_active=True).first()
+    # Look up user (must be active) and their firm in one round trip.
+    # Column-only load: no ORM hydration. Inner join drops orphaned users.
+    user = (
+        db.session.query(
+            User.user_id, User.firm_id, User.password_hash,
+            User.role, User.name, User.email, LawFirm.firm_name,
+        )
+        .join(LawFirm, User.firm_id == LawFirm.firm_id)
+        .filter(User.email == email, User.is_active.is_(True))
+        .first()
+    )
 
     if not user or not check_password_hash(user.password_hash, password):
         _log_failed_login(email)
         return unauthorized("Invalid email or password.")
 
-    # Verify firm exists
-    firm = LawFirm.query.get(user.firm_id)
-    if not firm:
-        return unauthorized("Firm not found.")
+    if _maybe_rehash(user, password):
+        db.session.commit()
 
     # Set session
     session.permanent = True
     session["user_id"] = user.user_id
     session["firm_id"] = user.firm_id
-    session["firm_name"] = firm.firm_name
+    session["firm_name"] = user.firm_name
     session["role"] = user.role.value
     session["name"] = user.name
     session["email"] = user.email
     session["logged_in_at"] = datetime.now(timezone.utc).isoformat()
+    # Precomputed once here so the frequently-polled /auth/session is a plain read
+    session["_status_payload"] = _build_status_payload()
 
     # Audit log
     _write_audit_log(
@@ -90,14 +131,7 @@ def login():
     )
 
     return success(data={
-        "user": {
-            "user_id":   user.user_id,
-            "firm_id":   user.firm_id,
-            "name":      user.name,
-            "email":     user.email,
-            "role":      user.role.value,
-            "firm_name": firm.firm_name,
-        },
+        "user":     session["_status_payload"]["user"],
         "redirect": "/admin/",
     }, message="Login successful.")
 
@@ -145,10 +179,20 @@ def session_status():
         "authenticated": false
     }
     """
+    payload = session.get("_status_payload")
+    if payload is not None:
+        return success(data=payload)
+
     if not session.get("user_id"):
         return success(data={"authenticated": False})
 
-    return success(data={
+    # Session created before the payload was cached at login
+    return success(data=_build_status_payload())
+
+
+def _build_status_payload() -> dict:
+    """Build the /auth/session body from the identity fields stored in the session."""
+    return {
         "authenticated": True,
         "user": {
             "user_id":   session.get("user_id"),
@@ -158,7 +202,7 @@ def session_status():
             "email":     session.get("email"),
             "role":      session.get("role"),
         },
-    })
+    }
 
 
 # ─── User management (admin only) ─────────────────────────────────────────────
@@ -175,9 +219,15 @@ def list_users():
         "users": [ { user_id, name, email, role, is_active, created_at } ]
     }
     """
-    from utils.auth import get_current_firm_id
     firm_id = get_current_firm_id()
-    users = User.query.filter_by(firm_id=firm_id).all()
+    users = (
+        db.session.query(
+            User.user_id, User.name, User.email,
+            User.role, User.is_active, User.created_at,
+        )
+        .filter(User.firm_id == firm_id)
+        .all()
+    )
     return success(data={
         "users": [
             {
@@ -206,7 +256,6 @@ def create_user():
         "user": { user_id, name, email, role }
     }
     """
-    from utils.auth import get_current_firm_id
     body = request.get_json() or {}
     firm_id = get_current_firm_id()
 
@@ -218,38 +267,46 @@ def create_user():
     if body["role"] not in ("admin", "lawyer"):
         return error("role must be 'admin' or 'lawyer'.")
 
-    # Check duplicate email
-    if User.query.filter_by(email=body["email"].strip().lower()).first():
-        return error("A user with this email already exists.", 409)
+    user_id = str(uuid.uuid4())
+    name    = body["name"].strip()
+    email   = body["email"].strip().lower()
+    role    = UserRole[body["role"]]
 
-    import uuid
-    from models import UserRole
-    user = User(
-        user_id=str(uuid.uuid4()),
-        firm_id=firm_id,
-        name=body["name"].strip(),
-        email=body["email"].strip().lower(),
-        password_hash=generate_password_hash(body["password"]),
-        role=UserRole[body["role"]],
-    )
-    db.session.add(user)
+    # Duplicate check and insert in one statement — no race between the two
+    inserted = db.session.execute(
+        pg_insert(User)
+        .values(
+            user_id=user_id,
+            firm_id=firm_id,
+            name=name,
+            email=email,
+            password_hash=generate_password_hash(body["password"], method=PASSWORD_HASH_METHOD),
+            role=role,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.user_id)
+    ).scalar_one_or_none()
+    if inserted is None:
+        db.session.rollback()
+        return error("A user with this email already exists.", 409)
 
     _write_audit_log(
         firm_id=firm_id,
-        action=f"Admin created new user '{user.name}' ({user.role.value}).",
+        action=f"Admin created new user '{name}' ({role.value}).",
         performed_by=session.get("user_id"),
         record_type="user",
-        record_id=user.user_id,
+        record_id=user_id,
     )
 
+    _flush_audit_buffer()
     db.session.commit()
 
     return success(data={
         "user": {
-            "user_id": user.user_id,
-            "name":    user.name,
-            "email":   user.email,
-            "role":    user.role.value,
+            "user_id": user_id,
+            "name":    name,
+            "email":   email,
+            "role":    role.value,
         }
     }, message="User created.", status_code=201)
 
@@ -264,7 +321,6 @@ def change_password(user_id):
     Users can change their own password.
     Admins can change any user's password in their firm.
     """
-    from utils.auth import get_current_firm_id
     body = request.get_json() or {}
     current_user = get_current_user()
     firm_id = get_current_firm_id()
@@ -286,8 +342,7 @@ def change_password(user_id):
     if len(new_password) < 8:
         return error("New password must be at least 8 characters.")
 
-    user.password_hash = generate_password_hash(new_password)
-    db.session.commit()
+    user.password_hash = generate_password_hash(new_password, method=PASSWORD_HASH_METHOD)
 
     _write_audit_log(
         firm_id=firm_id,
@@ -297,6 +352,8 @@ def change_password(user_id):
         record_id=user_id,
     )
 
+    db.session.commit()
+
     return success(message="Password updated successfully.")
 
 
@@ -308,7 +365,6 @@ def deactivate_user(user_id):
     Deactivates a user account (soft delete — sets is_active=False).
     Admin cannot deactivate themselves.
     """
-    from utils.auth import get_current_firm_id
     firm_id = get_current_firm_id()
     current_user = get_current_user()
 
@@ -320,7 +376,6 @@ def deactivate_user(user_id):
         return error("User not found.", 404)
 
     user.is_active = False
-    db.session.commit()
 
     _write_audit_log(
         firm_id=firm_id,
@@ -330,30 +385,78 @@ def deactivate_user(user_id):
         record_id=user_id,
     )
 
+    db.session.commit()
+
     return success(message=f"User '{user.name}' has been deactivated.")
 
 
 # ─── Private helpers ──────────────────────────────────────────────────────────
 
 def _write_audit_log(firm_id, action, performed_by=None, record_type=None, record_id=None):
-    """Write an entry to the AuditLogs table."""
-    import uuid
+    """Queue an AuditLogs entry on g; see the audit buffer notes at the top."""
+    if not current_app.config.get("AUDIT_ENABLED", True):
+        return
+    if not first_in_request(firm_id, action, record_type, record_id):
+        return
+    g.setdefault("audit_buffer", []).append({
+        "log_id":       new_uuid7(),
+        "firm_id":      firm_id,
+        "action":       action,
+        "performed_by": performed_by,
+        "record_type":  record_type,
+        "record_id":    record_id,
+    })
+
+
+def _flush_audit_buffer() -> bool:
+    """
+    Bulk-insert buffered audit rows into the current transaction (no commit).
+    Runs inside a SAVEPOINT so a failed audit write never aborts the caller's
+    changes. Returns True if any rows were staged.
+    """
+    buffer = g.get("audit_buffer")
+    if not buffer:
+        return False
     try:
-        log = AuditLog(
-            log_id=str(uuid.uuid4()),
-            firm_id=firm_id,
-            action=action,
-            performed_by=performed_by,
-            record_type=record_type,
-            record_id=record_id,
-        )
-        db.session.add(log)
-        db.session.commit()
+        with db.session.begin_nested():
+            db.session.bulk_insert_mappings(AuditLog, buffer)
     except Exception as e:
         current_app.logger.warning(f"Could not write audit log: {e}")
-        db.session.rollback()
+        return False
+    finally:
+        buffer.clear()
+    return True
+
+
+def _write_audit_rows(app, rows: list):
+    """
+    Background writer for deferred audit rows. Runs in its own app context,
+    so it gets its own scoped session rather than sharing the request's.
+    """
+    with app.app_context():
+        try:
+            db.session.bulk_insert_mappings(AuditLog, rows)
+            db.session.commit()
+        except Exception as e:
+            app.logger.warning(f"Could not write audit log: {e}")
+            db.session.rollback()
 
 
 def _log_failed_login(email: str):
     """Log a failed login attempt (no firm_id known at this point)."""
     current_app.logger.warning(f"Failed login attempt for email: {email}")
+
+
+def _maybe_rehash(user, plaintext: str) -> bool:
+    """
+    Re-hash a just-verified password if its stored hash uses older parameters.
+    Works with ORM objects and column-only rows (needs user_id + password_hash).
+    Stages an UPDATE; the caller commits. Returns True if a new hash was written.
+    """
+    if user.password_hash.startswith(PASSWORD_HASH_METHOD + "$"):
+        return False
+    User.query.filter_by(user_id=user.user_id).update(
+        {"password_hash": generate_password_hash(plaintext, method=PASSWORD_HASH_METHOD)},
+        synchronize_session=False,
+    )
+    return True
@@ -8,23 +8,63 @@ Portal links are pre-authenticated via ?token=<portal_token>.
 Format: /client/<reference_id>?token=<portal_token>
 """
 
+import os
 import uuid
+import secrets
+import hashlib
+import contextlib
 from datetime import datetime, timezone
 from flask import Blueprint, request, render_template, redirect, url_for, g, current_app
+from flask import session as flask_session
+from sqlalchemy import exists, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
 
 from database import db
 from models import (
     Client, ClientStatus, ClientChannel, WhatsAppState,
     Passport, EmiratesID, Statement, StatementChannel,
-    Document, DocumentCategory, RequestedDocument, AuditLog
+    Document, DocumentCategory, RequestedDocument, AuditLog, new_uuid7,
+    KYCRecord, ClientEdit,
 )
 from utils.response import success, error, not_found, unauthorized
-from utils.auth import client_token_auth, get_current_firm_id
-from utils.reference import generate_reference_id, generate_portal_token, token_expiry
-from utils.naming import make_document_filename
+from utils.auth import client_token_auth, get_current_firm_id, get_default_firm_id
+from utils.audit import first_in_request
+from utils.reference import generate_reference_id, generate_portal_token, hash_portal_token, token_expiry
+from utils.naming import make_document_filename, make_audio_filename
+from utils.validation import EMAIL_RE
+from utils.task_dispatcher import dispatch
+
+# Celery tasks — None when the worker stack isn't installed; every .delay()
+# below already sits in a try/except that degrades to a logged warning.
+try:
+    from tasks.process_docs import run_ocr, transcribe_statement, run_conflict_check, generate_ai_brief
+    from tasks.notifications import send_portal_link_email
+except ImportError:
+    run_ocr = transcribe_statement = run_conflict_check = generate_ai_brief = None
+    send_portal_link_email = None
 
 client_bp = Blueprint("client", __name__)
 
+# Portal page each status deep-links to (portal_entry)
+STEP_PAGES = {
+    ClientStatus.pending:            "upload",
+    ClientStatus.id_uploaded:        "upload",
+    ClientStatus.conflict_check:     "waiting",
+    ClientStatus.manual_review:      "waiting",
+    ClientStatus.context_collection: "statement",
+    ClientStatus.review:             "documents",
+    ClientStatus.approved:           "confirmation",
+    ClientStatus.rejected:           "confirmation",
+}
+
+# Statuses statement_complete may advance to review
+STATEMENT_ADVANCEABLE = frozenset({
+    ClientStatus.conflict_check,
+    ClientStatus.context_collection,
+    ClientStatus.id_uploaded,
+})
+
 
 # ════════════════════════════════════════════════════════════
 #  PAGE ROUTES  (render HTML templates)
@@ -52,24 +92,45 @@ def request_link():
     if not reference_id or not email:
         return error("reference_id and email are required.", 400)
 
-    client = Client.query.filter_by(reference_id=reference_id, email=email).first()
-    if not client:
+    # A malformed email can never match a stored client — skip the lookup
+    if not EMAIL_RE.match(email):
         return error("No matching record found. Please check your reference number and email.", 404)
 
-    # Renew token if expired
-    from datetime import datetime, timezone
-    if client.token_expires_at and client.token_expires_at < datetime.now(timezone.utc):
-        client.portal_token    = generate_portal_token()
-        client.token_expires_at = token_expiry(30)
+    # Column-only read; the usual still-valid case needs nothing else
+    row = (
+        db.session.query(Client.client_id, Client.portal_token, Client.token_expires_at)
+        .filter_by(reference_id=reference_id, email=email)
+        .first()
+    )
+    if not row:
+        return error("No matching record found. Please check your reference number and email.", 404)
+
+    # Renew token if expired. The expiry test is repeated in the UPDATE so two
+    # concurrent requests can't both renew; the loser re-reads the new token.
+    now = datetime.now(timezone.utc)
+    if row.token_expires_at and row.token_expires_at < now:
+        new_token = generate_portal_token()
+        renewed = db.session.execute(
+            update(Client)
+            .where(Client.client_id == row.client_id, Client.token_expires_at < now)
+            .values(portal_token=new_token, portal_token_hash=hash_portal_token(new_token),
+                    token_expires_at=token_expiry(30))
+            .returning(Client.client_id, Client.portal_token)
+            .execution_options(synchronize_session=False)
+        ).first()
         db.session.commit()
+        row = renewed or (
+            db.session.query(Client.client_id, Client.portal_token)
+            .filter_by(client_id=row.client_id)
+            .first()
+        )
 
-    portal_link  = f"/client/{client.reference_id}?token={client.portal_token}"
+    portal_link  = f"/client/{reference_id}?token={row.portal_token}"
     email_sent   = False
 
     # Queue portal link email via SendGrid
     try:
-        from tasks.notifications import send_portal_link_email
-        send_portal_link_email.delay(client.client_id, portal_link)
+        send_portal_link_email.delay(row.client_id, portal_link)
         email_sent = True
     except Exception:
         pass  # Celery/SendGrid not configured — degrade gracefully
@@ -100,24 +161,14 @@ def portal_entry(reference_id):
     if client.reference_id != reference_id:
         return unauthorized("Invalid portal link.")
 
-    step_map = {
-        ClientStatus.pending:            "upload",
-        ClientStatus.id_uploaded:        "upload",
-        ClientStatus.conflict_check:     "waiting",
-        ClientStatus.manual_review:      "waiting",
-        ClientStatus.context_collection: "statement",
-        ClientStatus.review:             "documents",
-        ClientStatus.approved:           "confirmation",
-        ClientStatus.rejected:           "confirmation",
-    }
-
-    step = step_map.get(client.status, "upload")
+    step = STEP_PAGES.get(client.status, "upload")
     token = request.args.get("token", "")
 
     # If in context_collection and KYC not yet submitted, go to KYC page first
     if client.status == ClientStatus.context_collection:
-        from models import KYCRecord
-        kyc_done = KYCRecord.query.filter_by(client_id=client.client_id).first()
+        kyc_done = db.session.execute(
+            select(exists().where(KYCRecord.client_id == client.client_id))
+        ).scalar()
         if not kyc_done:
             return redirect(url_for("client.kyc_page", reference_id=reference_id, token=token))
 
@@ -167,7 +218,7 @@ def status_check(reference_id):
 
 
 @client_bp.route("/<reference_id>/statement", methods=["GET"])
-@client_token_auth
+@client_token_auth(load=("statements",))
 def statement_page(reference_id):
     """Step 3 — statement (voice or text)."""
     client = g.client
@@ -180,16 +231,15 @@ def statement_page(reference_id):
 
 
 @client_bp.route("/<reference_id>/documents", methods=["GET"])
-@client_token_auth
+@client_token_auth(load=("documents", "requested_documents"))
 def documents_page(reference_id):
     """Step 4 — supporting documents."""
     client = g.client
-    requested = RequestedDocument.query.filter_by(client_id=client.client_id).all()
     return render_template(
         "client/documents.html",
         client=client,
         token=request.args.get("token", ""),
-        requested_docs=requested,
+        requested_docs=client.requested_documents,
         uploaded_docs=client.documents,
     )
 
@@ -199,7 +249,6 @@ def documents_page(reference_id):
 def kyc_page(reference_id):
     """KYC questionnaire — shown after conflict clear, before statement."""
     client = g.client
-    from models import KYCRecord
     existing_kyc = KYCRecord.query.filter_by(client_id=client.client_id).first()
     return render_template(
         "client/kyc.html",
@@ -219,7 +268,6 @@ def kyc_submit():
       sanctions_ack (bool), occupation, employer, country_of_residence
     }
     """
-    from models import KYCRecord
     client = g.client
     body   = request.get_json() or {}
 
@@ -231,8 +279,7 @@ def kyc_submit():
     if existing:
         kyc = existing
     else:
-        import uuid as _uuid
-        kyc = KYCRecord(kyc_id=str(_uuid.uuid4()), client_id=client.client_id)
+        kyc = KYCRecord(kyc_id=uuid.uuid4().hex, client_id=client.client_id)
         db.session.add(kyc)
 
     kyc.source_of_funds      = (body.get("source_of_funds") or "").strip() or None
@@ -245,9 +292,9 @@ def kyc_submit():
 
     _write_audit(
         client.firm_id,
-        f"KYC questionnaire submitted by client '{client.full_name}' ({client.reference_id})."
-        + (" PEP declared." if kyc.is_pep else ""),
+        "KYC questionnaire submitted by client '%s' (%s).%s",
         "kyc", client.client_id,
+        client.full_name, client.reference_id, " PEP declared." if kyc.is_pep else "",
     )
     db.session.commit()
 
@@ -277,7 +324,7 @@ def edit_page(reference_id):
 
 
 @client_bp.route("/<reference_id>/confirmation", methods=["GET"])
-@client_token_auth
+@client_token_auth(load=("passports", "statements", "documents"))
 def confirmation_page(reference_id):
     """Confirmation / thank you screen."""
     client = g.client
@@ -321,7 +368,7 @@ def start_post():
     errors = []
     if not full_name:           errors.append("full_name is required.")
     if not email:               errors.append("email is required.")
-    if "@" not in email:        errors.append("email is invalid.")
+    elif not EMAIL_RE.match(email): errors.append("email is invalid.")
     if not phone:               errors.append("phone is required.")
     if channel not in ("web", "whatsapp"): channel = "web"
     if errors:
@@ -330,11 +377,10 @@ def start_post():
     # Determine firm_id
     # When triggered by admin (New Intake modal), firm_id comes from session.
     # When a client self-registers via the public start page, we need a default firm.
-    from flask import session as flask_session
     firm_id = (
         body.get("firm_id")
         or flask_session.get("firm_id")
-        or _get_default_firm_id()
+        or get_default_firm_id()
     )
     if not firm_id:
         return error("No firm configured. Contact your administrator.", 500)
@@ -345,22 +391,23 @@ def start_post():
     expires_at    = token_expiry(days=current_app.config.get("TOKEN_EXPIRY_DAYS", 30))
 
     client = Client(
-        client_id      = str(uuid.uuid4()),
-        firm_id        = firm_id,
-        reference_id   = reference_id,
-        portal_token   = portal_token,
-        full_name      = full_name,
-        email          = email,
-        phone          = phone,
-        channel        = ClientChannel[channel],
-        whatsapp_state = WhatsAppState.greeting if channel == "whatsapp" else None,
-        status         = ClientStatus.pending,
-        token_expires_at = expires_at,
+        client_id         = uuid.uuid4().hex,
+        firm_id           = firm_id,
+        reference_id      = reference_id,
+        portal_token      = portal_token,
+        portal_token_hash = hash_portal_token(portal_token),
+        full_name         = full_name,
+        email             = email,
+        phone             = phone,
+        channel           = ClientChannel[channel],
+        whatsapp_state    = WhatsAppState.greeting if channel == "whatsapp" else None,
+        status            = ClientStatus.pending,
+        token_expires_at  = expires_at,
     )
 
     db.session.add(client)
-    _write_audit(firm_id, f"New client created: {full_name} ({reference_id}) via {channel}.",
-                 "client", client.client_id)
+    _write_audit(firm_id, "New client created: %s (%s) via %s.",
+                 "client", client.client_id, full_name, reference_id, channel)
     db.session.commit()
 
     portal_link = f"/client/{reference_id}?token={portal_token}"
@@ -400,8 +447,6 @@ def upload_passport():
 
     Response: { "passport_id", "preview_url", "ocr_status": "pending" }
     """
-    import os
-    from werkzeug.utils import secure_filename
 
     client = g.client
     file   = request.files.get("file")
@@ -413,30 +458,38 @@ def upload_passport():
     if ext not in current_app.config.get("ALLOWED_IMAGE_EXTENSIONS", {"jpg","jpeg","png","pdf"}):
         return error("Invalid file type. Please upload a JPG, PNG, or PDF.")
 
-    passport_id    = str(uuid.uuid4())
+    passport_id    = uuid.uuid4().hex
     upload_folder  = os.path.join(current_app.config["UPLOAD_FOLDER"], "passports", client.client_id)
-    os.makedirs(upload_folder, exist_ok=True)
+    _ensure_dir(upload_folder)
 
     safe_name = secure_filename(f"passport_{passport_id[:8]}.{ext}")
     file_path = os.path.join(upload_folder, safe_name)
-    file.save(file_path)
-
-    passport = Passport(
-        passport_id = passport_id,
-        client_id   = client.client_id,
-        image_path  = file_path,
-    )
-    db.session.add(passport)
-
-    # Advance client status
-    if client.status == ClientStatus.pending:
-        client.status = ClientStatus.id_uploaded
-
-    db.session.commit()
+    file_path, sha256 = _save_upload(file, file_path)
+
+    # Retried upload of the same image — keep the first record
+    existing = _find_duplicate_upload(Passport, client.client_id, sha256, file_path)
+    if not existing:
+        db.session.add(Passport(
+            passport_id    = passport_id,
+            client_id      = client.client_id,
+            image_path     = file_path,
+            content_sha256 = sha256,
+        ))
+
+        # Advance client status
+        if client.status == ClientStatus.pending:
+            client.status = ClientStatus.id_uploaded
+
+        existing = _commit_new_upload(Passport, client.client_id, sha256, file_path)
+    if existing:
+        return success(data={
+            "passport_id": existing.passport_id,
+            "preview_url": f"/api/documents/preview/passport/{existing.passport_id}",
+            "ocr_status":  "done" if existing.passport_number else "pending",
+        })
 
     # Enqueue OCR task (Step 11)
     try:
-        from tasks.process_docs import run_ocr
         run_ocr.delay(client.client_id, "passport", file_path, passport_id)
     except Exception:
         current_app.logger.warning("Celery not available — OCR will not run automatically.")
@@ -453,14 +506,14 @@ def upload_passport():
 @client_token_auth
 def delete_passport(passport_id):
     """DELETE /client/upload/passport/<passport_id>"""
-    import os
     client   = g.client
     passport = Passport.query.filter_by(passport_id=passport_id, client_id=client.client_id).first()
     if not passport:
         return not_found("Passport")
 
-    if passport.image_path and os.path.exists(passport.image_path):
-        os.remove(passport.image_path)
+    if passport.image_path:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(passport.image_path)
 
     db.session.delete(passport)
     db.session.commit()
@@ -474,9 +527,6 @@ def upload_emirates_id():
     POST /client/upload/emirates-id
     Same flow as passport upload but for Emirates ID.
     """
-    import os
-    from werkzeug.utils import secure_filename
-    from models import EmiratesID
 
     client = g.client
     file   = request.files.get("file")
@@ -488,21 +538,29 @@ def upload_emirates_id():
     if ext not in current_app.config.get("ALLOWED_IMAGE_EXTENSIONS", {"jpg","jpeg","png","pdf"}):
         return error("Invalid file type.")
 
-    id_record_id  = str(uuid.uuid4())
+    id_record_id  = uuid.uuid4().hex
     upload_folder = os.path.join(current_app.config["UPLOAD_FOLDER"], "emirates_ids", client.client_id)
-    os.makedirs(upload_folder, exist_ok=True)
+    _ensure_dir(upload_folder)
 
     safe_name = secure_filename(f"emirates_id_{id_record_id[:8]}.{ext}")
     file_path = os.path.join(upload_folder, safe_name)
-    file.save(file_path)
-
-    eid = EmiratesID(
-        id_record_id = id_record_id,
-        client_id    = client.client_id,
-        image_path   = file_path,
-    )
-    db.session.add(eid)
-    db.session.commit()
+    file_path, sha256 = _save_upload(file, file_path)
+
+    existing = _find_duplicate_upload(EmiratesID, client.client_id, sha256, file_path)
+    if not existing:
+        db.session.add(EmiratesID(
+            id_record_id   = id_record_id,
+            client_id      = client.client_id,
+            image_path     = file_path,
+            content_sha256 = sha256,
+        ))
+        existing = _commit_new_upload(EmiratesID, client.client_id, sha256, file_path)
+    if existing:
+        return success(data={
+            "id_record_id": existing.id_record_id,
+            "preview_url":  f"/api/ocr/preview/eid/{existing.id_record_id}",
+            "ocr_status":   "done" if existing.id_number else "pending",
+        })
 
     return success(
         data={"id_record_id": id_record_id, "preview_url": f"/api/ocr/preview/eid/{id_record_id}", "ocr_status": "pending"},
@@ -515,7 +573,7 @@ def upload_emirates_id():
 # ════════════════════════════════════════════════════════════
 
 @client_bp.route("/statement/text", methods=["POST"])
-@client_token_auth
+@client_token_auth(load=("statements",))
 def submit_text_statement():
     """
     POST /client/statement/text
@@ -529,12 +587,12 @@ def submit_text_statement():
     if not text:
         return error("Statement text cannot be empty.")
 
-    count = Statement.query.filter_by(client_id=client.client_id).count()
+    count = len(client.statements)
     if count >= 3:
         return error("Maximum 3 statements allowed. Your lawyer will follow up if more info is needed.")
 
     stmt = Statement(
-        statement_id      = str(uuid.uuid4()),
+        statement_id      = uuid.uuid4().hex,
         client_id         = client.client_id,
         sequence_number   = count + 1,
         client_edited_text = text,
@@ -551,7 +609,7 @@ def submit_text_statement():
 
 
 @client_bp.route("/statement/audio", methods=["POST"])
-@client_token_auth
+@client_token_auth(load=("statements",))
 def upload_audio():
     """
     POST /client/statement/audio
@@ -560,41 +618,46 @@ def upload_audio():
     Saves audio, creates Statement record with raw_audio_path.
     Whisper transcription queued as Celery task (Step 14).
     """
-    import os
-    from werkzeug.utils import secure_filename
-    from utils.naming import make_audio_filename
 
     client = g.client
     file   = request.files.get("audio_file")
     if not file or file.filename == "":
         return error("No audio file provided.")
 
-    count = Statement.query.filter_by(client_id=client.client_id).count()
+    count = len(client.statements)
     if count >= 3:
         return error("Maximum 3 statements allowed.")
 
     ext = _get_extension(file.filename) or "webm"
     seq = count + 1
     upload_folder = os.path.join(current_app.config["UPLOAD_FOLDER"], "audio", client.client_id)
-    os.makedirs(upload_folder, exist_ok=True)
+    _ensure_dir(upload_folder)
 
     fname     = make_audio_filename(client.client_id, seq, ext)
     file_path = os.path.join(upload_folder, secure_filename(fname))
-    file.save(file_path)
-
-    stmt = Statement(
-        statement_id    = str(uuid.uuid4()),
-        client_id       = client.client_id,
-        sequence_number = seq,
-        raw_audio_path  = file_path,
-        channel         = StatementChannel.web,
-    )
-    db.session.add(stmt)
-    db.session.commit()
+    file_path, sha256 = _save_upload(file, file_path)
+
+    existing = _find_duplicate_upload(Statement, client.client_id, sha256, file_path)
+    if not existing:
+        stmt = Statement(
+            statement_id    = uuid.uuid4().hex,
+            client_id       = client.client_id,
+            sequence_number = seq,
+            raw_audio_path  = file_path,
+            channel         = StatementChannel.web,
+            content_sha256  = sha256,
+        )
+        db.session.add(stmt)
+        existing = _commit_new_upload(Statement, client.client_id, sha256, file_path)
+    if existing:
+        return success(data={
+            "statement_id":          existing.statement_id,
+            "sequence_number":       existing.sequence_number,
+            "transcription_status":  "done" if existing.whisper_transcription else "pending",
+        })
 
     # Enqueue Whisper transcription (Step 14)
     try:
-        from tasks.process_docs import transcribe_statement
         transcribe_statement.delay(stmt.statement_id, file_path)
     except Exception:
         current_app.logger.warning("Celery not available — Whisper transcription will not run automatically.")
@@ -621,7 +684,7 @@ def get_transcription(statement_id):
 
 
 @client_bp.route("/statement/<statement_id>/confirm", methods=["POST"])
-@client_token_auth
+@client_token_auth(load=("statements",))
 def confirm_statement(statement_id):
     """
     POST /client/statement/<statement_id>/confirm
@@ -639,9 +702,9 @@ def confirm_statement(statement_id):
         return error("Statement text cannot be empty.")
 
     stmt.client_edited_text = text
+    total = len(client.statements)
     db.session.commit()
 
-    total = Statement.query.filter_by(client_id=client.client_id).count()
     return success(data={
         "statement_id":         statement_id,
         "sequence_number":      stmt.sequence_number,
@@ -654,7 +717,7 @@ def confirm_statement(statement_id):
 # ════════════════════════════════════════════════════════════
 
 @client_bp.route("/statement/complete", methods=["POST"])
-@client_token_auth
+@client_token_auth(load=("statements",))
 def statement_complete():
     """
     POST /client/statement/complete?token=...
@@ -671,17 +734,13 @@ def statement_complete():
         return error("Please provide at least one statement before continuing.")
 
     # Advance status toward document collection
-    advanceable = (
-        ClientStatus.conflict_check,
-        ClientStatus.context_collection,
-        ClientStatus.id_uploaded,
-    )
-    if client.status in advanceable:
+    if client.status in STATEMENT_ADVANCEABLE:
         client.status = ClientStatus.review
         _write_audit(
             client.firm_id,
-            f"Client '{client.full_name}' completed statement step ({len(confirmed)} statement(s)).",
+            "Client '%s' completed statement step (%d statement(s)).",
             "client", client.client_id,
+            client.full_name, len(confirmed),
         )
         db.session.commit()
 
@@ -692,7 +751,7 @@ def statement_complete():
 # ── List existing statements (page restore on reload) ─────
 
 @client_bp.route("/statement/list", methods=["GET"])
-@client_token_auth
+@client_token_auth(load=("statements",))
 def list_statements():
     """
     GET /client/statement/list?token=...
@@ -700,19 +759,22 @@ def list_statements():
     Used when returning client reloads the statement page.
     """
     client = g.client
+    statements, total_confirmed = [], 0
+    for s in client.statements:   # relationship is ordered by sequence_number
+        confirmed = bool(s.client_edited_text)
+        total_confirmed += confirmed
+        statements.append({
+            "statement_id":       s.statement_id,
+            "sequence_number":    s.sequence_number,
+            "client_edited_text": s.client_edited_text,
+            "has_audio":          bool(s.raw_audio_path),
+            "channel":            s.channel.value,
+            "confirmed":          confirmed,
+        })
+
     return success(data={
-        "statements": [
-            {
-                "statement_id":       s.statement_id,
-                "sequence_number":    s.sequence_number,
-                "client_edited_text": s.client_edited_text,
-                "has_audio":          bool(s.raw_audio_path),
-                "channel":            s.channel.value,
-                "confirmed":          bool(s.client_edited_text),
-            }
-            for s in sorted(client.statements, key=lambda x: x.sequence_number)
-        ],
-        "total_confirmed": sum(1 for s in client.statements if s.client_edited_text),
+        "statements":      statements,
+        "total_confirmed": total_confirmed,
     })
 
 
@@ -725,7 +787,7 @@ def list_statements():
 # ════════════════════════════════════════════════════════════
 
 @client_bp.route("/upload/complete", methods=["POST"])
-@client_token_auth
+@client_token_auth(load=("passports",))
 def upload_complete():
     """
     POST /client/upload/complete?token=...
@@ -746,14 +808,14 @@ def upload_complete():
         client.status = ClientStatus.conflict_check
         _write_audit(
             client.firm_id,
-            f"Client '{client.full_name}' completed ID upload step.",
+            "Client '%s' completed ID upload step.",
             "client", client.client_id,
+            client.full_name,
         )
         db.session.commit()
 
         # Enqueue OCR for each passport and conflict check (Steps 11/12)
         try:
-            from tasks.process_docs import run_ocr
             for p in client.passports:
                 run_ocr.delay(client.client_id, "passport", p.image_path, p.passport_id)
         except Exception:
@@ -766,7 +828,7 @@ def upload_complete():
 # ── List uploaded passports (for page reload / returning client) ──
 
 @client_bp.route("/upload/passports", methods=["GET"])
-@client_token_auth
+@client_token_auth(load=("passports", "emirates_ids"))
 def list_passports():
     """
     GET /client/upload/passports?token=...
@@ -798,9 +860,6 @@ def upload_document():
     POST /client/documents/upload
     Form: file, document_type, request_id (optional)
     """
-    import os
-    from werkzeug.utils import secure_filename
-    from datetime import date
 
     client   = g.client
     file     = request.files.get("file")
@@ -819,56 +878,58 @@ def upload_document():
     saved_name = make_document_filename(client.full_name, doc_type.value, ext)
 
     upload_folder = os.path.join(current_app.config["UPLOAD_FOLDER"], "documents", client.client_id)
-    os.makedirs(upload_folder, exist_ok=True)
-
-    file_path = os.path.join(upload_folder, secure_filename(saved_name))
-    # Avoid overwrites — append short uuid if name exists
-    if os.path.exists(file_path):
-        saved_name = f"{saved_name.rsplit('.', 1)[0]}_{str(uuid.uuid4())[:6]}.{ext}"
-        file_path  = os.path.join(upload_folder, secure_filename(saved_name))
-
-    file.save(file_path)
-
-    doc = Document(
-        document_id       = str(uuid.uuid4()),
-        client_id         = client.client_id,
-        original_filename = file.filename,
-        saved_filename    = saved_name,
-        file_path         = file_path,
-        file_type         = doc_type,
-        requested_by_firm = bool(request_id),
-    )
-    db.session.add(doc)
-
-    # Mark requested doc as received
-    if request_id:
-        req_doc = RequestedDocument.query.filter_by(
-            request_id=request_id, client_id=client.client_id
-        ).first()
-        if req_doc:
-            req_doc.is_received           = True
-            req_doc.received_document_id  = doc.document_id
+    _ensure_dir(upload_folder)
+
+    # Name taken (same type, same day) → _save_upload picks a suffixed one
+    wanted_path       = os.path.join(upload_folder, secure_filename(saved_name))
+    file_path, sha256 = _save_upload(file, wanted_path)
+    if file_path != wanted_path:
+        saved_name = os.path.basename(file_path)
+
+    doc    = _find_duplicate_upload(Document, client.client_id, sha256, file_path)
+    is_new = doc is None
+    if is_new:
+        doc = Document(
+            document_id       = uuid.uuid4().hex,
+            client_id         = client.client_id,
+            original_filename = file.filename,
+            saved_filename    = saved_name,
+            file_path         = file_path,
+            file_type         = doc_type,
+            requested_by_firm = bool(request_id),
+            content_sha256    = sha256,
+            is_present        = True,
+        )
+        db.session.add(doc)
 
-    db.session.commit()
+    _mark_request_received(client.client_id, request_id, doc.document_id)
+    existing = _commit_new_upload(Document, client.client_id, sha256, file_path) if is_new else None
+    if existing:
+        # A concurrent retry stored this file first; the rollback undid the mark
+        doc = existing
+        _mark_request_received(client.client_id, request_id, doc.document_id)
+        db.session.commit()
+    elif not is_new:
+        db.session.commit()
 
     return success(data={
         "document_id":    doc.document_id,
-        "saved_filename": saved_name,
-        "file_type":      doc_type.value,
+        "saved_filename": doc.saved_filename,
+        "file_type":      doc.file_type.value,
     }, status_code=201)
 
 
 @client_bp.route("/documents/<document_id>", methods=["DELETE"])
 @client_token_auth
 def delete_document(document_id):
-    import os
     client = g.client
     doc    = Document.query.filter_by(document_id=document_id, client_id=client.client_id).first()
     if not doc:
         return not_found("Document")
 
-    if doc.file_path and os.path.exists(doc.file_path):
-        os.remove(doc.file_path)
+    if doc.file_path:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(doc.file_path)
 
     # Re-open checklist item if applicable
     req = RequestedDocument.query.filter_by(received_document_id=document_id).first()
@@ -904,7 +965,7 @@ def update_document_category(document_id):
 # ════════════════════════════════════════════════════════════
 
 @client_bp.route("/submit", methods=["POST"])
-@client_token_auth
+@client_token_auth(load=("passports", "statements"))
 def submit():
     """
     POST /client/submit
@@ -922,15 +983,15 @@ def submit():
 
     _write_audit(
         client.firm_id,
-        f"Client '{client.full_name}' ({client.reference_id}) submitted intake.",
+        "Client '%s' (%s) submitted intake.",
         "client", client.client_id,
+        client.full_name, client.reference_id,
     )
     db.session.commit()
 
     # Enqueue AI brief generation (Step 16)
     try:
-        from tasks.process_docs import generate_ai_brief
-        generate_ai_brief.delay(client.client_id)
+        dispatch(generate_ai_brief, client.client_id)
     except Exception:
         current_app.logger.warning("Celery not available — AI brief will not be generated automatically.")
 
@@ -952,13 +1013,13 @@ def edit_profile():
     Body: { "full_name", "email", "phone" }
     All edits logged. Passport number changes re-trigger conflict check.
     """
-    from models import ClientEdit
     client = g.client
     body   = request.get_json() or {}
 
     editable          = ["full_name", "email", "phone"]
     name_changed      = False
     recheck_triggered = False
+    edits             = []
 
     for field in editable:
         new_val = body.get(field)
@@ -968,24 +1029,29 @@ def edit_profile():
             if str(old_val) != str(new_val):
                 if field == "full_name":
                     name_changed = True
-                edit = ClientEdit(
-                    edit_id=str(uuid.uuid4()),
+                edits.append(ClientEdit(
+                    edit_id=uuid.uuid4().hex,
                     client_id=client.client_id,
                     field_changed=field,
                     old_value=str(old_val),
                     new_value=str(new_val),
                     re_conflict_check_triggered=name_changed,
-                )
-                db.session.add(edit)
+                ))
                 setattr(client, field, new_val)
 
+    # Re-posted form with nothing new: skip the BEGIN/COMMIT round trip
+    if not edits:
+        return success(data={"recheck_triggered": False}, message="Profile updated.")
+
+    # One executemany for the whole edit history instead of an INSERT per field
+    db.session.bulk_save_objects(edits)
+    client_id = client.client_id   # read before commit expires the instance
     db.session.commit()
 
     # Re-trigger conflict check if name changed (embedding will differ)
     if name_changed:
         try:
-            from tasks.process_docs import run_conflict_check
-            run_conflict_check.delay(client.client_id)
+            dispatch(run_conflict_check, client_id)
             recheck_triggered = True
         except Exception:
             pass
@@ -1003,18 +1069,123 @@ def _get_extension(filename: str) -> str:
     return ""
 
 
-def _get_default_firm_id() -> str | None:
-    """Return the first firm in the DB — used for self-service portal."""
-    from models import LawFirm
-    firm = LawFirm.query.order_by(LawFirm.created_at).first()
-    return firm.firm_id if firm else None
+UPLOAD_CHUNK_SIZE = 1024 * 1024   # 1 MiB
+
+# Upload folders this process has already created. Nothing removes them at
+# runtime, so later uploads for the same client skip the makedirs stat.
+_created_dirs: set[str] = set()
 
 
-def _write_audit(firm_id, action, record_type=None, record_id=None, performed_by=None):
-    import uuid as _uuid
+def _ensure_dir(path: str):
+    if path in _created_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    _created_dirs.add(path)
+
+
+
+def _save_upload(file, file_path: str) -> tuple[str, str]:
+    """
+    Stream an uploaded FileStorage to disk in 1 MiB chunks and return
+    (path written, SHA-256 hex digest), hashed in the same pass.
+    FileStorage.save() copies through 16 KiB reads; passport scans and audio
+    are multi-MB, so larger chunks cut the number of Python-level copies.
+
+    The file is created exclusively ("x"): if file_path already exists —
+    an earlier upload, or a concurrent retry of this one — a random suffix
+    is added instead. The returned path belongs to this request alone, so
+    dedupe can delete it without touching another request's file.
+    """
+    stem, ext = os.path.splitext(file_path)
+    path      = file_path
+    while True:
+        try:
+            dst = open(path, "xb")
+            break
+        except FileExistsError:
+            path = f"{stem}_{secrets.token_hex(3)}{ext}"
+    digest = hashlib.sha256()
+    try:
+        with dst:
+            while chunk := file.stream.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                dst.write(chunk)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+# Column each upload model keeps its file path in
+_UPLOAD_PATH_ATTR = {
+    Passport:   "image_path",
+    EmiratesID: "image_path",
+    Statement:  "raw_audio_path",
+    Document:   "file_path",
+}
+
+
+def _discard_upload_copy(existing, new_path: str):
+    """Delete this request's copy, unless it is the file `existing` points at."""
+    if new_path != getattr(existing, _UPLOAD_PATH_ATTR[type(existing)]):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(new_path)
+
+
+def _find_duplicate_upload(model, client_id: str, sha256: str, new_path: str):
+    """
+    Return the client's existing row of `model` with the same content hash,
+    deleting the just-written copy at new_path. None if the upload is new.
+    """
+    existing = model.query.filter_by(client_id=client_id, content_sha256=sha256).first()
+    if existing:
+        _discard_upload_copy(existing, new_path)
+    return existing
+
+
+def _commit_new_upload(model, client_id: str, sha256: str, new_path: str):
+    """
+    Commit the session holding a new upload row. Two retries of the same
+    upload can both pass _find_duplicate_upload; the loser's commit hits the
+    unique (client_id, content_sha256) index. Roll back, delete its copy at
+    new_path and return the winner's row. None when this commit won.
+    """
+    try:
+        db.session.commit()
+        return None
+    except IntegrityError:
+        db.session.rollback()
+        existing = model.query.filter_by(client_id=client_id, content_sha256=sha256).first()
+        if existing is None:
+            raise       # some other constraint
+        _discard_upload_copy(existing, new_path)
+        return existing
+
+
+def _mark_request_received(client_id: str, request_id, document_id: str):
+    """Mark the firm's document request as received by document_id, if any."""
+    if not request_id:
+        return
+    req_doc = RequestedDocument.query.filter_by(request_id=request_id, client_id=client_id).first()
+    if req_doc:
+        req_doc.is_received          = True
+        req_doc.received_document_id = document_id
+
+
+def _write_audit(firm_id, action, record_type=None, record_id=None, *args, performed_by=None):
+    """
+    Stage an AuditLogs row; it is inserted by the route's own commit (no separate flush).
+    `action` is a %-template filled from *args only when AUDIT_ENABLED is on.
+    """
+    if not current_app.config.get("AUDIT_ENABLED", True):
+        return
+    action = action % args if args else action
+    if not first_in_request(firm_id, action, record_type, record_id):
+        return
     try:
         log = AuditLog(
-            log_id=str(_uuid.uuid4()),
+            log_id=new_uuid7(),
             firm_id=firm_id,
             action=action,
             performed_by=performed_by,
@@ -1022,7 +1193,6 @@ def _write_audit(firm_id, action, record_type=None, record_id=None, performed_by
             record_id=record_id,
         )
         db.session.add(log)
-        db.session.flush()
     except Exception as e:
         current_app.logger.warning(f"Audit log failed: {e}")
 
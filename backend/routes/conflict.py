@@ -12,15 +12,17 @@ Conflict check flow:
 import uuid
 import logging
 from flask import Blueprint, request
+from sqlalchemy.orm import joinedload
 
 from database import db
 from models import (
-    Client, ConflictResult, ConflictIndex,
+    Client, ConflictResult,
     MatchType, ConflictDecision, ClientStatus,
 )
 from utils.response import success, error, not_found
 from utils.auth import login_required, get_current_firm_id
 from utils.conflict_schema import normalise_manual_input, validate_payload
+from utils.task_dispatcher import dispatch
 
 conflict_bp = Blueprint("conflict", __name__)
 logger = logging.getLogger(__name__)
@@ -46,17 +48,13 @@ def run_check(client_id):
         "client_id": str
     }
     """
-    client = Client.query.filter_by(
-        client_id=client_id,
-        firm_id=get_current_firm_id(),
-    ).first()
-    if not client:
+    if not _client_belongs(client_id, get_current_firm_id()):
         return not_found("Client")
 
     try:
         from tasks.process_docs import run_conflict_check
-        task = run_conflict_check.delay(client_id)
-        return success(data={"task_id": task.id, "client_id": client_id})
+        task_id = dispatch(run_conflict_check, client_id)
+        return success(data={"task_id": task_id, "client_id": client_id})
     except Exception as exc:
         # Celery not available — run synchronously
         logger.warning(f"Celery unavailable, running conflict check synchronously: {exc}")
@@ -79,15 +77,13 @@ def get_result(client_id):
     GET /api/conflict/result/<client_id>
     Returns the latest conflict check result for a client.
     """
-    client = Client.query.filter_by(
-        client_id=client_id,
-        firm_id=get_current_firm_id(),
-    ).first()
-    if not client:
+    if not _client_belongs(client_id, get_current_firm_id()):
         return not_found("Client")
 
+    # matched_record is read below; load it in the same JOINed SELECT
     result = (
         ConflictResult.query
+        .options(joinedload(ConflictResult.matched_record))
         .filter_by(client_id=client_id)
         .order_by(ConflictResult.created_at.desc())
         .first()
@@ -137,15 +133,19 @@ def get_history(client_id):
     GET /api/conflict/history/<client_id>
     Returns all conflict check results for a client (newest first).
     """
-    client = Client.query.filter_by(
-        client_id=client_id,
-        firm_id=get_current_firm_id(),
-    ).first()
-    if not client:
+    if not _client_belongs(client_id, get_current_firm_id()):
         return not_found("Client")
 
+    # Column-only projection: rows are plain tuples, no ORM instances
     results = (
-        ConflictResult.query
+        db.session.query(
+            ConflictResult.conflict_id,
+            ConflictResult.match_type,
+            ConflictResult.confidence_score,
+            ConflictResult.decision,
+            ConflictResult.decision_reason,
+            ConflictResult.created_at,
+        )
         .filter_by(client_id=client_id)
         .order_by(ConflictResult.created_at.desc())
         .all()
@@ -226,19 +226,21 @@ def check_manual():
     if not best:
         best = {"match_type": MatchType.none, "confidence_score": 0.0, "matched_record_id": None}
 
-    matched = None
-    if best.get("matched_record_id"):
-        rec = ConflictIndex.query.get(best["matched_record_id"])
-        if rec:
-            matched = {
-                "record_id":        rec.record_id,
-                "full_name":        rec.full_name,
-                "case_type":        rec.case_type,
-                "passport_numbers": rec.passport_numbers or [],
-            }
-
     return success(data={
         "match_type":       best["match_type"].value,
         "confidence_score": float(best["confidence_score"]),
-        "matched_record":   matched,
+        "matched_record":   best.get("matched_record"),
     })
+
+
+# ════════════════════════════════════════════════════════════
+#  Helpers
+# ════════════════════════════════════════════════════════════
+
+def _client_belongs(client_id: str, firm_id: str) -> bool:
+    """Firm-scope check as one EXISTS probe — no Client row is loaded."""
+    return db.session.query(
+        db.session.query(Client.client_id)
+        .filter_by(client_id=client_id, firm_id=firm_id)
+        .exists()
+    ).scalar()
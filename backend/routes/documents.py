@@ -7,16 +7,23 @@ These routes are for admin access: list, download, rename, delete.
 """
 
 import os
+import base64
+import binascii
+import functools
 import mimetypes
 import logging
-from flask import Blueprint, request, send_file, current_app
-
-from database import db
-from models import Document, Client, RequestedDocument
+import unicodedata
+import zipfile
+from urllib.parse import quote
+from flask import Blueprint, Response, request, send_file, current_app
+from sqlalchemy import tuple_
+
+from database import db, no_expire_on_commit
+from models import Document, Client, RequestedDocument, utcnow
 from utils.response import success, error, not_found, forbidden
 from utils.auth import login_required, get_current_firm_id
 from utils.naming import make_document_filename
-from datetime import date
+from datetime import date, datetime
 
 documents_bp = Blueprint("documents", __name__)
 logger = logging.getLogger(__name__)
@@ -57,18 +64,22 @@ def download_document(document_id):
     if not doc:
         return not_found("Document")
 
-    if not os.path.exists(doc.file_path):
+    # send_file stats the path itself (size, mtime for ETag/Range handling),
+    # so a missing file is caught here rather than with a separate exists().
+    # With USE_X_SENDFILE the body is handed to the web server entirely.
+    try:
+        return send_file(
+            doc.file_path,
+            mimetype=_mime_for(doc.file_path),
+            as_attachment=True,
+            download_name=doc.saved_filename,
+            conditional=True,
+        )
+    except FileNotFoundError:
         logger.warning(f"File missing on disk: {doc.file_path}")
+        _mark_missing(doc)
         return not_found("Document file (missing from disk)")
 
-    mime, _ = mimetypes.guess_type(doc.file_path)
-    return send_file(
-        doc.file_path,
-        mimetype=mime or "application/octet-stream",
-        as_attachment=True,
-        download_name=doc.saved_filename,
-    )
-
 
 # ════════════════════════════════════════════════════════════
 #  Admin — inline preview (images / PDF)
@@ -86,16 +97,17 @@ def preview_document(document_id):
     if not doc:
         return not_found("Document")
 
-    if not os.path.exists(doc.file_path):
+    try:
+        return send_file(
+            doc.file_path,
+            mimetype=_mime_for(doc.file_path),
+            as_attachment=False,
+            conditional=True,
+        )
+    except FileNotFoundError:
+        _mark_missing(doc)
         return not_found("Document file")
 
-    mime, _ = mimetypes.guess_type(doc.file_path)
-    return send_file(
-        doc.file_path,
-        mimetype=mime or "application/octet-stream",
-        as_attachment=False,
-    )
-
 
 # ════════════════════════════════════════════════════════════
 #  Admin — rename / re-categorise
@@ -116,6 +128,7 @@ def update_document(document_id):
 
     body = request.get_json() or {}
     new_type_str = body.get("file_type")
+    renamed = None      # (old_path, new_path) once the file has moved
     if new_type_str:
         try:
             new_type = DocumentCategory[new_type_str.lower().replace(" ", "_")]
@@ -130,18 +143,60 @@ def update_document(document_id):
             new_name = make_document_filename(client.full_name, new_type.value, ext, date.today())
             new_path = os.path.join(os.path.dirname(doc.file_path), new_name)
             # Only rename if name actually changed and target doesn't exist
-            if new_path != doc.file_path and not os.path.exists(new_path):
+            if new_path != doc.file_path:
                 try:
-                    os.rename(doc.file_path, new_path)
-                    doc.file_path     = new_path
-                    doc.saved_filename = new_name
+                    if _move_no_clobber(doc.file_path, new_path):
+                        renamed            = (doc.file_path, new_path)
+                        doc.file_path      = new_path
+                        doc.saved_filename = new_name
                 except OSError as e:
                     logger.warning(f"Could not rename document file: {e}")
 
-    db.session.commit()
+    # Re-posted form with nothing new: skip the BEGIN/COMMIT round trip
+    if not db.session.is_modified(doc):
+        return success(data=_doc_dict(doc))
+
+    # _doc_dict reads every column back; without this the commit would
+    # expire them and the serialisation would re-SELECT the row.
+    with no_expire_on_commit(db.session):
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            if renamed:         # keep disk in step with the row that stayed put
+                try:
+                    os.replace(renamed[1], renamed[0])
+                except OSError as e:
+                    logger.error(f"Could not restore {renamed[0]} after failed commit: {e}")
+            raise
     return success(data=_doc_dict(doc))
 
 
+def _move_no_clobber(src: str, dst: str) -> bool:
+    """
+    Rename src to dst unless dst exists. Returns False when dst is taken.
+
+    link() fails with EEXIST instead of clobbering, so the existence check
+    and the move are one atomic step. Filesystems without hard links (some
+    bind, network and overlay mounts) fall back to check-then-rename.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        return False
+    except OSError:
+        if os.path.exists(dst):
+            return False
+        os.rename(src, dst)
+        return True
+    try:
+        os.unlink(src)
+    except OSError:
+        os.unlink(dst)      # don't leave the file under both names
+        raise
+    return True
+
+
 # ════════════════════════════════════════════════════════════
 #  Admin — delete
 # ════════════════════════════════════════════════════════════
@@ -160,9 +215,11 @@ def delete_document(document_id):
         return not_found("Document")
 
     # Remove file from disk
-    if doc.file_path and os.path.exists(doc.file_path):
+    if doc.file_path:
         try:
             os.remove(doc.file_path)
+        except FileNotFoundError:
+            pass
         except OSError as e:
             logger.warning(f"Could not delete file {doc.file_path}: {e}")
 
@@ -209,11 +266,14 @@ def list_client_documents(client_id):
 @login_required
 def list_all_documents():
     """
-    GET /api/documents/?page=1&per_page=50&file_type=<type>
-    Returns documents across all clients for this firm.
+    GET /api/documents/?cursor=<next_cursor>&per_page=50&file_type=<type>
+    Returns documents across all clients for this firm, newest first.
+
+    Keyset-paginated: pass the previous response's next_cursor to get the
+    next page. Each page is an index seek on (uploaded_at, document_id), so
+    there is no OFFSET scan and no COUNT(*) over the firm's documents.
     """
     firm_id  = get_current_firm_id()
-    page     = int(request.args.get("page", 1))
     per_page = min(int(request.args.get("per_page", 50)), 200)
     file_type_filter = request.args.get("file_type")
 
@@ -221,7 +281,7 @@ def list_all_documents():
         Document.query
         .join(Client, Document.client_id == Client.client_id)
         .filter(Client.firm_id == firm_id)
-        .order_by(Document.uploaded_at.desc())
+        .order_by(Document.uploaded_at.desc(), Document.document_id.desc())
     )
 
     if file_type_filter:
@@ -232,15 +292,23 @@ def list_all_documents():
         except KeyError:
             pass
 
-    total = query.count()
-    docs  = query.offset((page - 1) * per_page).limit(per_page).all()
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            after = _decode_cursor(cursor)
+        except ValueError:
+            return error("Invalid cursor.", 400)
+        query = query.filter(tuple_(Document.uploaded_at, Document.document_id) < after)
+
+    rows     = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    docs     = rows[:per_page]
 
     return success(data={
-        "documents": [_doc_dict(d) for d in docs],
-        "total":     total,
-        "page":      page,
-        "per_page":  per_page,
-        "pages":     (total + per_page - 1) // per_page,
+        "documents":   [_doc_dict(d) for d in docs],
+        "per_page":    per_page,
+        "has_more":    has_more,
+        "next_cursor": _encode_cursor(docs[-1]) if has_more else None,
     })
 
 
@@ -255,7 +323,6 @@ def download_client_zip(client_id):
     GET /api/documents/client/<client_id>/zip
     Returns a ZIP archive of all documents for a client.
     """
-    import io, zipfile
     firm_id = get_current_firm_id()
     client  = Client.query.filter_by(client_id=client_id, firm_id=firm_id).first()
     if not client:
@@ -265,20 +332,17 @@ def download_client_zip(client_id):
     if not docs:
         return error("No documents to download.", 404)
 
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for doc in docs:
-            if os.path.exists(doc.file_path):
-                zf.write(doc.file_path, arcname=doc.saved_filename)
-    buf.seek(0)
-
+    # The archive is compressed while it is sent: each write to the zip lands
+    # in a small buffer that is yielded straight to the client, so memory
+    # stays at one chunk instead of the whole archive.
+    entries   = [(doc.file_path, doc.saved_filename) for doc in docs]
     safe_name = client.full_name.replace(" ", "_")
-    return send_file(
-        buf,
-        mimetype="application/zip",
-        as_attachment=True,
-        download_name=f"{safe_name}_{client.reference_id}_documents.zip",
+    response  = Response(_stream_zip(entries), mimetype="application/zip")
+    response.headers.set(
+        "Content-Disposition", "attachment",
+        **_attachment_names(f"{safe_name}_{client.reference_id}_documents.zip"),
     )
+    return response
 
 
 # ════════════════════════════════════════════════════════════
@@ -286,17 +350,112 @@ def download_client_zip(client_id):
 # ════════════════════════════════════════════════════════════
 
 def _get_doc_scoped(document_id: str, firm_id: str):
-    """Return a Document only if it belongs to the given firm."""
-    doc = Document.query.get(document_id)
-    if not doc:
-        return None
-    client = Client.query.filter_by(client_id=doc.client_id, firm_id=firm_id).first()
-    if not client:
-        return None
-    return doc
+    """Return a Document only if it belongs to the given firm (one JOINed query)."""
+    return (
+        Document.query
+        .join(Client, Document.client_id == Client.client_id)
+        .filter(Document.document_id == document_id, Client.firm_id == firm_id)
+        .first()
+    )
+
+
+def _mark_missing(doc: Document):
+    """Record a file found missing on serve, ahead of the next presence sweep."""
+    if doc.is_present:
+        doc.is_present  = False
+        doc.verified_at = utcnow()
+        db.session.commit()
+
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+# Formats that are already compressed: DEFLATE burns CPU on them for ~0% gain,
+# so they are stored as-is and only the rest (txt, csv, doc, ...) is deflated.
+ZIP_STORED_EXTENSIONS = frozenset({
+    "pdf", "jpg", "jpeg", "png", "gif", "webp", "heic",
+    "docx", "xlsx", "pptx", "zip", "mp3", "mp4", "m4a", "ogg", "webm",
+})
+
+
+class _ZipSink:
+    """Write-only, non-seekable target for ZipFile; collects bytes until drained."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _stream_zip(entries):
+    """Yield a ZIP of (path, arcname) pairs chunk by chunk."""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path, arcname in entries:
+            try:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+            except FileNotFoundError:
+                continue
+            ext = arcname.rsplit(".", 1)[-1].lower()
+            info.compress_type = zipfile.ZIP_STORED if ext in ZIP_STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            with open(path, "rb") as src, zf.open(info, "w") as dst:
+                while chunk := src.read(ZIP_CHUNK_SIZE):
+                    dst.write(chunk)
+                    if data := sink.drain():
+                        yield data
+    yield sink.drain()  # local header/descriptor tail + central directory
+
+
+def _attachment_names(download_name: str) -> dict:
+    """Content-Disposition filename params, RFC 5987-encoded when non-ASCII (as send_file does)."""
+    try:
+        download_name.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", download_name).encode("ascii", "ignore").decode("ascii")
+        return {"filename": simple, "filename*": f"UTF-8''{quote(download_name, safe='!#$&+-.^_`|~')}"}
+    return {"filename": download_name}
+
+
+@functools.lru_cache(maxsize=256)
+def _mime_for_ext(ext: str) -> str:
+    mime, _ = mimetypes.guess_type(f"x.{ext}")
+    return mime or "application/octet-stream"
+
+
+def _mime_for(path: str) -> str:
+    """MIME type for a stored file, cached per extension (download hot path)."""
+    return _mime_for_ext(os.path.splitext(path)[1][1:].lower())
+
+
+for _ext in ("pdf", "jpg", "jpeg", "png", "heic", "doc", "docx"):
+    _mime_for_ext(_ext)   # warm at import (also loads the mimetypes registry)
+
+
+def _encode_cursor(doc: Document) -> str:
+    """Opaque keyset cursor for list_all_documents: (uploaded_at, document_id)."""
+    raw = f"{doc.uploaded_at.isoformat()}|{doc.document_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Inverse of _encode_cursor; raises ValueError on anything malformed."""
+    try:
+        uploaded_at, document_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(uploaded_at), document_id
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(str(e)) from e
 
 
 def _doc_dict(doc: Document) -> dict:
+    """Serialise a Document. file_exists comes from the stored presence flag."""
     return {
         "document_id":       doc.document_id,
         "client_id":         doc.client_id,
@@ -307,5 +466,5 @@ def _doc_dict(doc: Document) -> dict:
         "uploaded_at":       doc.uploaded_at.isoformat() if doc.uploaded_at else None,
         "download_url":      f"/api/documents/{doc.document_id}/download",
         "preview_url":       f"/api/documents/{doc.document_id}/preview",
-        "file_exists":       os.path.exists(doc.file_path),
+        "file_exists":       doc.is_present,
     }
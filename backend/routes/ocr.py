@@ -7,21 +7,53 @@ via utils/conflict_schema.py before being saved or checked.
 
 import os
 import logging
-from flask import Blueprint, request, send_file, current_app, g
+import mimetypes
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+from datetime import datetime, timezone
+from flask import Blueprint, Response, request, send_file, current_app, g
+from sqlalchemy import update
+from sqlalchemy.orm import load_only
+from werkzeug.http import is_resource_modified
+from werkzeug.wsgi import wrap_file
 
 from database import db
 from models import Passport, EmiratesID, Client
-from utils.response import success, error, not_found
+from utils.response import success, error, not_found, forbidden, unauthorized
 from utils.auth import client_token_auth
 from utils.conflict_schema import normalise_ocr_output
+from utils.ocr import extract_text_blocks, extract_passport_fields, extract_emirates_id_fields, ocr_backend
+from utils.reference import hash_portal_token
+from utils.task_dispatcher import dispatch
 
 ocr_bp = Blueprint("ocr", __name__)
 logger = logging.getLogger(__name__)
 
+PREVIEW_MAX_AGE = 86400    # seconds; preview URLs point at immutable uploads
+
+# Celery state → portal-facing status for /status/<task_id>
+STATUS_MAP = {
+    "PENDING":  "pending",
+    "STARTED":  "processing",
+    "SUCCESS":  "done",
+    "FAILURE":  "failed",
+    "RETRY":    "processing",
+    "REVOKED":  "failed",
+}
+TERMINAL_STATES = frozenset({"SUCCESS", "FAILURE", "REVOKED"})
+
+# A finished task's status never changes, so repeat polls for it are answered
+# from this process without asking the result backend. Bounded, oldest first out.
+_TERMINAL_CACHE_SIZE = 10000
+_terminal_cache      = OrderedDict()
+_terminal_cache_lock = threading.Lock()
+
 
 # ════════════════════════════════════════════════════════════
-#  Synchronous OCR endpoints (called directly, not via Celery)
-#  Used for on-demand re-processing or admin triggering.
+#  On-demand OCR endpoints — queued on Celery (202 + task_id,
+#  poll /api/ocr/status/<task_id>); run inline only when Celery
+#  is unavailable. Used for re-processing or admin triggering.
 # ════════════════════════════════════════════════════════════
 
 @ocr_bp.route("/passport", methods=["POST"])
@@ -30,8 +62,9 @@ def process_passport():
     POST /api/ocr/passport
     Body JSON: { "passport_id": str }
 
-    Runs PaddleOCR synchronously on the passport image.
-    Updates the Passport record and returns extracted fields + conflict payload.
+    Queues PaddleOCR on the passport image and returns 202 with the task_id;
+    the task updates the Passport record. Without Celery, runs inline and
+    returns the extracted fields + conflict payload.
     """
     body = request.get_json() or {}
     passport_id = body.get("passport_id")
@@ -47,23 +80,24 @@ def process_passport():
         return error("Passport image file not found on server.", 404)
 
     try:
-        from utils.ocr import extract_text_blocks, extract_passport_fields
+        from tasks.process_docs import run_ocr
+        task_id = dispatch(run_ocr, passport.client_id, "passport", passport.image_path, passport_id)
+        return success(data={"passport_id": passport_id, "task_id": task_id, "status": "pending"},
+                       message="OCR queued.", status_code=202)
+    except Exception as exc:
+        # Celery not available — run synchronously
+        logger.warning(f"Celery unavailable, running passport OCR synchronously: {exc}")
+
+    try:
         texts  = extract_text_blocks(passport.image_path)
         fields = extract_passport_fields(texts)
+        logger.info(f"OCR passport {passport_id}: {len(texts)} blocks ({ocr_backend()})")
     except ImportError:
         return error("PaddleOCR is not installed. Run: pip install paddleocr paddlepaddle", 503)
     except Exception as exc:
         logger.exception(f"OCR failed for passport {passport_id}: {exc}")
         return error(f"OCR processing failed: {exc}", 500)
 
-    # Persist to DB
-    passport.passport_number = fields.get("passport_number")
-    passport.nationality     = fields.get("nationality")
-    passport.date_of_birth   = fields.get("date_of_birth")
-    passport.expiry_date     = fields.get("expiry_date")
-    passport.ocr_raw         = {**fields, "raw_texts": texts}
-    db.session.commit()
-
     # Build conflict payload
     ocr_raw_for_schema = {
         "full_name":       fields.get("full_name"),
@@ -72,6 +106,22 @@ def process_passport():
     }
     conflict_payload = normalise_ocr_output(ocr_raw_for_schema, source_file=passport.image_path)
 
+    # Persist to DB — one UPDATE, no ORM flush of the loaded row
+    db.session.execute(
+        update(Passport)
+        .where(Passport.passport_id == passport_id)
+        .values(
+            passport_number  = fields.get("passport_number"),
+            nationality      = fields.get("nationality"),
+            date_of_birth    = fields.get("date_of_birth"),
+            expiry_date      = fields.get("expiry_date"),
+            ocr_raw          = {**fields, "raw_texts": texts},
+            conflict_payload = conflict_payload,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
     return success(data={
         "passport_id":      passport_id,
         "extracted":        fields,
@@ -85,7 +135,8 @@ def process_emirates_id():
     POST /api/ocr/emirates-id
     Body JSON: { "id_record_id": str }
 
-    Runs PaddleOCR synchronously on an Emirates ID image.
+    Queues PaddleOCR on an Emirates ID image (202 + task_id); inline
+    without Celery, as for /passport.
     """
     body = request.get_json() or {}
     id_record_id = body.get("id_record_id")
@@ -101,20 +152,24 @@ def process_emirates_id():
         return error("Emirates ID image file not found on server.", 404)
 
     try:
-        from utils.ocr import extract_text_blocks, extract_emirates_id_fields
+        from tasks.process_docs import run_ocr
+        task_id = dispatch(run_ocr, eid.client_id, "emirates_id", eid.image_path, id_record_id)
+        return success(data={"id_record_id": id_record_id, "task_id": task_id, "status": "pending"},
+                       message="OCR queued.", status_code=202)
+    except Exception as exc:
+        # Celery not available — run synchronously
+        logger.warning(f"Celery unavailable, running Emirates ID OCR synchronously: {exc}")
+
+    try:
         texts  = extract_text_blocks(eid.image_path)
         fields = extract_emirates_id_fields(texts)
+        logger.info(f"OCR Emirates ID {id_record_id}: {len(texts)} blocks ({ocr_backend()})")
     except ImportError:
         return error("PaddleOCR is not installed. Run: pip install paddleocr paddlepaddle", 503)
     except Exception as exc:
         logger.exception(f"OCR failed for Emirates ID {id_record_id}: {exc}")
         return error(f"OCR processing failed: {exc}", 500)
 
-    # Persist
-    eid.id_number = fields.get("id_number")
-    eid.ocr_raw   = {**fields, "raw_texts": texts}
-    db.session.commit()
-
     # Build conflict payload
     ocr_raw_for_schema = {
         "full_name":   fields.get("full_name"),
@@ -123,6 +178,19 @@ def process_emirates_id():
     }
     conflict_payload = normalise_ocr_output(ocr_raw_for_schema, source_file=eid.image_path)
 
+    # Persist — one UPDATE, no ORM flush of the loaded row
+    db.session.execute(
+        update(EmiratesID)
+        .where(EmiratesID.id_record_id == id_record_id)
+        .values(
+            id_number        = fields.get("id_number"),
+            ocr_raw          = {**fields, "raw_texts": texts},
+            conflict_payload = conflict_payload,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
     return success(data={
         "id_record_id":    id_record_id,
         "extracted":       fields,
@@ -138,32 +206,35 @@ def process_emirates_id():
 def ocr_status(task_id):
     """
     GET /api/ocr/status/<task_id>
-    Poll for a Celery OCR task status.
+    Poll for a Celery OCR task status. Finished tasks are served from an
+    in-process cache.
     """
+    cached = _terminal_cache.get(task_id)
+    if cached is not None:
+        return success(data=cached)
+
     try:
         from tasks.celery_app import celery
         from celery.result import AsyncResult
         result = AsyncResult(task_id, app=celery)
 
-        status_map = {
-            "PENDING":  "pending",
-            "STARTED":  "processing",
-            "SUCCESS":  "done",
-            "FAILURE":  "failed",
-            "RETRY":    "processing",
-            "REVOKED":  "failed",
-        }
-
-        state  = status_map.get(result.state, "pending")
-        output = result.result if result.state == "SUCCESS" else None
-        err_msg = str(result.result) if result.state == "FAILURE" else None
+        raw     = result.state
+        state   = STATUS_MAP.get(raw, "pending")
+        output  = result.result if raw == "SUCCESS" else None
+        err_msg = str(result.result) if raw == "FAILURE" else None
 
-        return success(data={
+        data = {
             "task_id": task_id,
             "status":  state,
             "result":  output,
             "error":   err_msg,
-        })
+        }
+        if raw in TERMINAL_STATES:
+            with _terminal_cache_lock:
+                _terminal_cache[task_id] = data
+                if len(_terminal_cache) > _TERMINAL_CACHE_SIZE:
+                    _terminal_cache.popitem(last=False)
+        return success(data=data)
     except Exception as exc:
         return success(data={
             "task_id": task_id,
@@ -181,38 +252,38 @@ def ocr_status(task_id):
 def trigger_ocr_for_client(client_id):
     """
     POST /api/ocr/run/<client_id>
-    Admin route — queue OCR Celery tasks for all uploaded passport/ID images.
-    Returns a list of Celery task IDs.
+    Admin route — queue OCR for all uploaded passport/ID images as one
+    batched Celery task (one task, one commit, one conflict check).
+    Returns the queued images with the batch task ID, or 503 without a
+    background worker (the per-image /passport and /emirates-id routes
+    still run OCR inline).
     """
-    from utils.auth import login_required
-    from models import Client
-
-    client = Client.query.get(client_id)
-    if not client:
+    if not db.session.query(db.exists().where(Client.client_id == client_id)).scalar():
         return not_found("Client")
 
-    from tasks.process_docs import run_ocr
-    task_ids = []
+    # Plain (id, path) rows — no Client / Passport / EmiratesID objects built
+    passports = (
+        db.session.query(Passport.passport_id, Passport.image_path)
+        .filter_by(client_id=client_id)
+        .all()
+    )
+    eids = (
+        db.session.query(EmiratesID.id_record_id, EmiratesID.image_path)
+        .filter_by(client_id=client_id)
+        .all()
+    )
+    items  = [["passport", rid, path] for rid, path in passports if os.path.exists(path)]
+    items += [["emirates_id", rid, path] for rid, path in eids if os.path.exists(path)]
 
-    for passport in client.passports:
-        if os.path.exists(passport.image_path):
-            task = run_ocr.delay(
-                client_id     = client_id,
-                document_type = "passport",
-                file_path     = passport.image_path,
-                record_id     = passport.passport_id,
-            )
-            task_ids.append({"type": "passport", "record_id": passport.passport_id, "task_id": task.id})
-
-    for eid in client.emirates_ids:
-        if os.path.exists(eid.image_path):
-            task = run_ocr.delay(
-                client_id     = client_id,
-                document_type = "emirates_id",
-                file_path     = eid.image_path,
-                record_id     = eid.id_record_id,
-            )
-            task_ids.append({"type": "emirates_id", "record_id": eid.id_record_id, "task_id": task.id})
+    task_ids = []
+    if items:
+        try:
+            from tasks.process_docs import run_ocr_batch
+            task_id = dispatch(run_ocr_batch, client_id, items)
+        except Exception as exc:
+            logger.warning(f"Celery unavailable, cannot queue OCR batch for client {client_id}: {exc}")
+            return error("Background OCR is unavailable — run OCR on each document instead.", 503)
+        task_ids = [{"type": t, "record_id": rid, "task_id": task_id} for t, rid, _ in items]
 
     return success(data={"queued": task_ids, "count": len(task_ids)})
 
@@ -227,28 +298,35 @@ def preview_passport(passport_id):
     GET /api/ocr/preview/passport/<passport_id>?token=<portal_token>
     Serve the uploaded passport image for preview in the client portal.
     """
-    passport = Passport.query.get(passport_id)
+    # Only the columns the preview needs — ocr_raw can be tens of KB of JSON
+    passport = (
+        Passport.query
+        .options(load_only(Passport.passport_id, Passport.client_id, Passport.image_path))
+        .filter_by(passport_id=passport_id)
+        .first()
+    )
     if not passport:
         return not_found("Passport")
 
     # Verify token ownership
     token = request.args.get("token", "")
     if token:
-        from models import Client
-        from datetime import datetime, timezone
-        client = Client.query.filter_by(portal_token=token).first()
+        client = (
+            Client.query
+            .options(load_only(Client.client_id, Client.token_expires_at))
+            .filter_by(portal_token_hash=hash_portal_token(token))
+            .first()
+        )
         if not client or client.client_id != passport.client_id:
-            from utils.response import forbidden
             return forbidden("Access denied.")
         if client.token_expires_at and client.token_expires_at < datetime.now(timezone.utc):
-            from utils.response import unauthorized
             return unauthorized("Token expired.")
 
-    if not os.path.exists(passport.image_path):
+    try:
+        return _serve_file_zero_copy(passport.image_path)
+    except FileNotFoundError:
         return not_found("Image file")
 
-    return send_file(passport.image_path)
-
 
 @ocr_bp.route("/preview/eid/<id_record_id>", methods=["GET"])
 def preview_eid(id_record_id):
@@ -256,23 +334,100 @@ def preview_eid(id_record_id):
     GET /api/ocr/preview/eid/<id_record_id>?token=<portal_token>
     Serve the uploaded Emirates ID image.
     """
-    eid = EmiratesID.query.get(id_record_id)
+    eid = (
+        EmiratesID.query
+        .options(load_only(EmiratesID.id_record_id, EmiratesID.client_id, EmiratesID.image_path))
+        .filter_by(id_record_id=id_record_id)
+        .first()
+    )
     if not eid:
         return not_found("Emirates ID")
 
     token = request.args.get("token", "")
     if token:
-        from models import Client
-        from datetime import datetime, timezone
-        client = Client.query.filter_by(portal_token=token).first()
+        client = (
+            Client.query
+            .options(load_only(Client.client_id, Client.token_expires_at))
+            .filter_by(portal_token_hash=hash_portal_token(token))
+            .first()
+        )
         if not client or client.client_id != eid.client_id:
-            from utils.response import forbidden
             return forbidden("Access denied.")
         if client.token_expires_at and client.token_expires_at < datetime.now(timezone.utc):
-            from utils.response import unauthorized
             return unauthorized("Token expired.")
 
-    if not os.path.exists(eid.image_path):
+    try:
+        return _serve_file_zero_copy(eid.image_path)
+    except FileNotFoundError:
         return not_found("Image file")
 
-    return send_file(eid.image_path)
+
+# ════════════════════════════════════════════════════════════
+#  Helpers
+# ════════════════════════════════════════════════════════════
+
+def _serve_file_zero_copy(path: str) -> Response:
+    """
+    Serve an uploaded file without copying it through Python where possible.
+
+    With X_ACCEL_REDIRECT_PREFIX set (nginx in front), only an
+    X-Accel-Redirect header is returned and nginx sends the file from its
+    internal location. Otherwise send_file hands the open file to the
+    server's wsgi.file_wrapper (gunicorn → sendfile(2)) with one stat()
+    feeding Content-Length and the validators; USE_X_SENDFILE covers
+    Apache/lighttpd. Raises FileNotFoundError if the file is gone.
+
+    Uploads never change in place, so responses are privately cacheable for
+    PREVIEW_MAX_AGE and a matching If-None-Match / If-Modified-Since gets a
+    304 straight from the stat, without opening the file. Range requests
+    get a 206 with just the requested bytes (If-Range is honoured).
+    """
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    prefix   = current_app.config.get("X_ACCEL_REDIRECT_PREFIX")
+    if prefix:
+        rel = os.path.relpath(os.path.abspath(path),
+                              os.path.abspath(current_app.config["UPLOAD_FOLDER"]))
+        if not rel.startswith(os.pardir):
+            response = Response(mimetype=mimetype)
+            response.headers["X-Accel-Redirect"] = quote(f"{prefix.rstrip('/')}/{rel.replace(os.sep, '/')}")
+            return _private_cache(response)
+
+    st       = os.stat(path)
+    etag     = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    modified = datetime.fromtimestamp(int(st.st_mtime), tz=timezone.utc)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=modified):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.last_modified = modified
+        return _private_cache(response)
+
+    if current_app.config.get("USE_X_SENDFILE"):
+        response = send_file(path, mimetype=mimetype, etag=etag, last_modified=modified, conditional=True)
+        response.accept_ranges = "bytes"
+        return _private_cache(response)
+
+    # What send_file(path) does, minus its second stat(): the size, ETag and
+    # Last-Modified all come from the stat above.
+    response = Response(
+        wrap_file(request.environ, open(path, "rb")),
+        mimetype=mimetype,
+        direct_passthrough=True,
+    )
+    response.content_length = st.st_size
+    response.set_etag(etag)
+    response.last_modified = modified
+    response = response.make_conditional(request.environ, accept_ranges=True,
+                                         complete_length=st.st_size)
+    # make_conditional only says so on 206s; advertise ranges on full 200s
+    # too, so browsers know they may come back for just the bytes they need
+    response.accept_ranges = "bytes"
+    return _private_cache(response)
+
+
+def _private_cache(response: Response) -> Response:
+    """Browser-only caching: ID images must never sit in a shared cache."""
+    response.cache_control.no_cache = None
+    response.cache_control.public   = False
+    response.cache_control.private  = True
+    response.cache_control.max_age  = PREVIEW_MAX_AGE
+    return response
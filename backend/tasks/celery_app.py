@@ -28,5 +28,27 @@ celery.conf.update(
     enable_utc=True,
     task_track_started=True,
     worker_prefetch_multiplier=1,
+    # Outbound WhatsApp replies are short I/O-bound Twilio calls; they get their
+    # own queue so a worker (prefetch 4, see README) drains them beside OCR jobs
+    task_routes={"tasks.send_whatsapp": {"queue": "whatsapp_out"}},
     task_acks_late=True,
+    result_expires=3600,          # OCR results are polled via /api/ocr/status shortly after
+    # The portal polls /api/ocr/status every second from every gunicorn
+    # thread. One backend object shared by all threads (instead of one per
+    # thread) keeps a single Redis connection pool warm for those GETs.
+    result_backend_thread_safe=True,
+    redis_max_connections=50,
+    redis_socket_keepalive=True,
+    redis_backend_health_check_interval=30,
+    broker_pool_limit=10,
+    # Broker connections idle between webhook bursts; keepalive stops NAT /
+    # load balancers silently dropping them. visibility_timeout must exceed
+    # the longest OCR batch, or acks_late tasks get redelivered mid-run.
+    broker_transport_options={"visibility_timeout": 3600, "socket_keepalive": True},
+    beat_schedule={
+        "verify-document-presence": {
+            "task":     "tasks.verify_document_presence",
+            "schedule": float(os.environ.get("DOCUMENT_SWEEP_INTERVAL", 3600)),  # seconds
+        },
+    },
 )
@@ -1,7 +1,7 @@
 """
-notifications.py — Background Celery tasks for email notifications.
+notifications.py — Background Celery tasks for email and WhatsApp notifications.
 
-Each task gracefully degrades if SendGrid is not configured.
+Each task gracefully degrades if SendGrid / Twilio is not configured.
 """
 
 import logging
@@ -133,3 +133,34 @@ def send_status_email(self, client_id: str, new_status: str):
     except Exception as exc:
         log.warning(f"send_status_email failed: {exc}")
         raise self.retry(exc=exc)
+
+
+@celery.task(bind=True, name="tasks.send_whatsapp", max_retries=3, default_retry_delay=10)
+def send_whatsapp(self, to: str, messages: list):
+    """
+    Send WhatsApp replies queued by the webhook, in order.
+
+    Args:
+        to:       Recipient, "whatsapp:+971..."
+        messages: Message bodies, sent one after another
+
+    On a Twilio error the task retries with only the messages not yet sent,
+    so nothing is delivered twice and the order is kept. Each message first
+    waits for a token from the shared send bucket (utils/rate_limit.py).
+    """
+    import time
+    from config import Config
+    from utils.rate_limit import take_whatsapp_token
+    from utils.whatsapp import send_whatsapp_message
+
+    # Workers run without a Flask app context: credentials come from Config
+    creds = (Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN, Config.TWILIO_WHATSAPP_NUMBER)
+    for i, body in enumerate(messages):
+        while (wait := take_whatsapp_token()) > 0:
+            time.sleep(wait)
+        try:
+            send_whatsapp_message(to, body, *creds, raise_errors=True)
+        except Exception as exc:
+            log.warning(f"WhatsApp send to {to} failed ({exc}), retrying…")
+            raise self.retry(exc=exc, args=(to, messages[i:]))
+
@@ -27,15 +27,13 @@ def run_ocr(self, client_id: str, document_type: str, file_path: str, record_id:
         file_path:     Absolute path to the uploaded image
         record_id:     passport_id or id_record_id to update
 
-    Saves extracted fields to the relevant DB record, builds a conflict
-    check payload via normalise_ocr_output(), and triggers run_conflict_check
+    Saves extracted fields and the conflict check payload built by
+    normalise_ocr_output() to the relevant DB record, and triggers run_conflict_check
     once OCR is complete (if all passports for the client are done).
     """
     import os
     from database import db
-    from models import Passport, EmiratesID, Client
-    from utils.ocr import extract_text_blocks, extract_passport_fields, extract_emirates_id_fields
-    from utils.conflict_schema import normalise_ocr_output
+    from utils.ocr import extract_text_blocks
 
     logger.info(f"[OCR] Starting {document_type} OCR for client {client_id}, record {record_id}")
 
@@ -50,25 +48,68 @@ def run_ocr(self, client_id: str, document_type: str, file_path: str, record_id:
         logger.exception(f"[OCR] PaddleOCR failed: {exc}")
         raise self.retry(exc=exc, countdown=15)
 
+    result = _apply_ocr(document_type, file_path, record_id, texts)
+    if result["status"] == "done":
+        db.session.commit()
+        _queue_conflict_check_if_ready(client_id)
+    return result
+
+
+@celery.task(bind=True, name="tasks.run_ocr_batch", max_retries=2)
+def run_ocr_batch(self, client_id: str, items: list):
+    """
+    OCR several ID images of one client in a single task.
+
+    Args:
+        client_id: Client UUID
+        items:     [document_type, record_id, file_path] per image
+
+    Every image goes through the process's resident predictor, all record
+    updates land in one commit, and the conflict check is queued at most
+    once — instead of one task, commit and readiness check per image. A
+    failure retries the whole batch; nothing is committed until the end.
+    """
+    import os
+    from database import db
+    from utils.ocr import extract_text_blocks
+
+    logger.info(f"[OCR] Starting batch of {len(items)} image(s) for client {client_id}")
+
+    results = []
+    for document_type, record_id, file_path in items:
+        if not os.path.exists(file_path):
+            logger.error(f"[OCR] File not found: {file_path}")
+            results.append({"status": "skipped", "record_id": record_id, "reason": "file not found"})
+            continue
+        try:
+            texts = extract_text_blocks(file_path)
+        except Exception as exc:
+            db.session.rollback()
+            logger.exception(f"[OCR] PaddleOCR failed on {file_path}: {exc}")
+            raise self.retry(exc=exc, countdown=15)
+        results.append(_apply_ocr(document_type, file_path, record_id, texts))
+
+    db.session.commit()
+    if any(r["status"] == "done" for r in results):
+        _queue_conflict_check_if_ready(client_id)
+    return {"status": "done", "results": results}
+
+
+def _apply_ocr(document_type: str, file_path: str, record_id: str | None, texts: list[str]) -> dict:
+    """
+    Parse OCR text for one image and write it to its Passport / EmiratesID
+    row with a single UPDATE (the caller commits). Returns the task result dict.
+    """
+    from sqlalchemy import update
+    from database import db
+    from models import Passport, EmiratesID
+    from utils.ocr import extract_passport_fields, extract_emirates_id_fields
+    from utils.conflict_schema import normalise_ocr_output
+
     if document_type == "passport":
         fields = extract_passport_fields(texts)
         logger.info(f"[OCR] Passport fields: {fields}")
 
-        if record_id:
-            passport = Passport.query.get(record_id)
-            if passport:
-                passport.passport_number = fields.get("passport_number")
-                passport.nationality     = fields.get("nationality")
-                passport.date_of_birth   = fields.get("date_of_birth")
-                passport.expiry_date     = fields.get("expiry_date")
-                # Store full extraction (including name, gender, etc.) in JSONB
-                passport.ocr_raw = {
-                    **fields,
-                    "raw_texts": texts,
-                }
-                db.session.commit()
-                logger.info(f"[OCR] Passport {record_id} updated with OCR data.")
-
         # Build conflict schema from OCR output
         ocr_raw = {
             "full_name":       fields.get("full_name"),
@@ -77,21 +118,28 @@ def run_ocr(self, client_id: str, document_type: str, file_path: str, record_id:
         }
         conflict_payload = normalise_ocr_output(ocr_raw, source_file=file_path)
 
+        if record_id:
+            updated = db.session.execute(
+                update(Passport)
+                .where(Passport.passport_id == record_id)
+                .values(
+                    passport_number  = fields.get("passport_number"),
+                    nationality      = fields.get("nationality"),
+                    date_of_birth    = fields.get("date_of_birth"),
+                    expiry_date      = fields.get("expiry_date"),
+                    # Store full extraction (including name, gender, etc.) in JSONB
+                    ocr_raw          = {**fields, "raw_texts": texts},
+                    conflict_payload = conflict_payload,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if updated:
+                logger.info(f"[OCR] Passport {record_id} updated with OCR data.")
+
     elif document_type == "emirates_id":
         fields = extract_emirates_id_fields(texts)
         logger.info(f"[OCR] Emirates ID fields: {fields}")
 
-        if record_id:
-            eid = EmiratesID.query.get(record_id)
-            if eid:
-                eid.id_number = fields.get("id_number")
-                eid.ocr_raw   = {
-                    **fields,
-                    "raw_texts": texts,
-                }
-                db.session.commit()
-                logger.info(f"[OCR] Emirates ID {record_id} updated with OCR data.")
-
         ocr_raw = {
             "full_name":   fields.get("full_name"),
             "id_number":   fields.get("id_number"),
@@ -99,11 +147,37 @@ def run_ocr(self, client_id: str, document_type: str, file_path: str, record_id:
         }
         conflict_payload = normalise_ocr_output(ocr_raw, source_file=file_path)
 
+        if record_id:
+            updated = db.session.execute(
+                update(EmiratesID)
+                .where(EmiratesID.id_record_id == record_id)
+                .values(
+                    id_number        = fields.get("id_number"),
+                    ocr_raw          = {**fields, "raw_texts": texts},
+                    conflict_payload = conflict_payload,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if updated:
+                logger.info(f"[OCR] Emirates ID {record_id} updated with OCR data.")
+
     else:
         logger.warning(f"[OCR] Unknown document_type: {document_type}")
         return {"status": "skipped", "reason": f"unknown document_type: {document_type}"}
 
-    # Check if all passports for this client have been OCR'd
+    return {
+        "status":           "done",
+        "document_type":    document_type,
+        "record_id":        record_id,
+        "extracted":        fields,
+        "conflict_payload": conflict_payload,
+    }
+
+
+def _queue_conflict_check_if_ready(client_id: str):
+    """Queue the conflict check once every passport for the client has been OCR'd."""
+    from models import Client
+
     client = Client.query.get(client_id)
     if client:
         all_done = all(
@@ -114,14 +188,6 @@ def run_ocr(self, client_id: str, document_type: str, file_path: str, record_id:
             logger.info(f"[OCR] All passports done for {client_id}, queuing conflict check.")
             run_conflict_check.delay(client_id)  # will notify WhatsApp on completion
 
-    return {
-        "status":           "done",
-        "document_type":    document_type,
-        "record_id":        record_id,
-        "extracted":        fields,
-        "conflict_payload": conflict_payload,
-    }
-
 
 # ════════════════════════════════════════════════════════════
 #  Step 14 — Whisper transcription
@@ -295,3 +361,66 @@ def generate_ai_brief(self, client_id: str):
 
     logger.info(f"[AI Brief] Brief {brief.brief_id} generated for client {client_id}.")
     return {"status": "done", "brief_id": brief.brief_id}
+
+
+# ════════════════════════════════════════════════════════════
+#  Maintenance — document presence sweep (Celery beat)
+# ════════════════════════════════════════════════════════════
+
+@celery.task(name="tasks.verify_document_presence")
+def verify_document_presence(batch_size: int = 500):
+    """
+    Refresh Document.is_present / verified_at against the upload folder so
+    API serialisation can read the flag instead of stat()ing every file.
+    Walks the table in primary-key batches; each batch costs one scandir()
+    per upload directory and two UPDATEs.
+
+    Each UPDATE matches (document_id, file_path) as read, so a document whose
+    file was renamed after the read keeps its flag until the next sweep
+    rather than being judged on its old path.
+    """
+    import os
+    from sqlalchemy import tuple_, update
+    from database import db
+    from models import Document, utcnow
+
+    checked = missing_total = 0
+    last_id = ""
+    while True:
+        rows = (
+            db.session.query(Document.document_id, Document.file_path)
+            .filter(Document.document_id > last_id)
+            .order_by(Document.document_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].document_id
+
+        on_disk = set()
+        for directory in {os.path.dirname(r.file_path) for r in rows}:
+            try:
+                with os.scandir(directory or ".") as it:
+                    on_disk.update(os.path.join(directory, e.name) for e in it)
+            except OSError:
+                continue  # directory gone → none of its files exist
+
+        missing = [(r.document_id, r.file_path) for r in rows if r.file_path not in on_disk]
+        present = [(r.document_id, r.file_path) for r in rows if r.file_path in on_disk]
+        now     = utcnow()
+        for checked_rows, flag in ((missing, False), (present, True)):
+            if checked_rows:
+                db.session.execute(
+                    update(Document)
+                    .where(tuple_(Document.document_id, Document.file_path).in_(checked_rows))
+                    .values(is_present=flag, verified_at=now)
+                )
+        db.session.commit()
+
+        checked       += len(rows)
+        missing_total += len(missing)
+
+    if missing_total:
+        logger.warning(f"[Sweep] {missing_total} of {checked} document file(s) missing from disk.")
+    return {"checked": checked, "missing": missing_total}
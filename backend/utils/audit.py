@@ -0,0 +1,22 @@
+"""
+utils/audit.py — Per-request audit log de-duplication.
+
+The audit writers in routes/auth.py, routes/client.py and routes/admin.py
+call `first_in_request()` before staging a row, so the same event recorded
+twice in one request (e.g. a retried step) produces a single AuditLogs row.
+"""
+
+from flask import g
+
+
+def first_in_request(firm_id, action, record_type=None, record_id=None) -> bool:
+    """
+    Return True the first time this (firm_id, action, record_type, record_id)
+    is seen in the current request, False on every repeat.
+    """
+    key  = (firm_id, action, record_type, record_id)
+    seen = g.setdefault("audit_seen", set())
+    if key in seen:
+        return False
+    seen.add(key)
+    return True
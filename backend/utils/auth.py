@@ -39,19 +39,29 @@ def admin_required(f):
     return decorated
 
 
-def client_token_auth(f):
+def client_token_auth(f=None, *, load=()):
     """
     Validate a client's portal token from query string (?token=...).
     Attaches the client object to flask.g as g.client on success.
     Returns 401 if token missing or invalid / expired.
+
+    load: Client relationship names the route reads (e.g. ("passports",
+    "statements")). They are selectin-loaded together with the token lookup
+    instead of lazily one-by-one as the route touches them.
+
+        @client_token_auth
+        @client_token_auth(load=("statements",))
     """
+    if f is None:
+        return lambda fn: client_token_auth(fn, load=load)
+
     @wraps(f)
     def decorated(*args, **kwargs):
         token = request.args.get("token") or (request.get_json() or {}).get("portal_token")
         if not token:
             return unauthorized("Portal token required.")
 
-        client = _validate_client_token(token)
+        client = _validate_client_token(token, load)
         if client is None:
             return unauthorized("Invalid or expired portal token.")
 
@@ -81,24 +91,56 @@ def get_current_firm_id() -> str | None:
     return session.get("firm_id")
 
 
+def get_default_firm_id() -> str | None:
+    """
+    Return the first firm in the DB — the firm self-service portal and
+    WhatsApp intakes are filed under.
+
+    Memoised on the app config: the default firm is fixed at seed time, so
+    only the first lookup per app queries for it. "No firm" is not cached,
+    so a later seed is picked up. Pop "_DEFAULT_FIRM_ID" from the config if
+    firms are reconfigured.
+    """
+    cached = current_app.config.get("_DEFAULT_FIRM_ID")
+    if cached:
+        return cached
+    from models import LawFirm
+    firm = LawFirm.query.order_by(LawFirm.created_at).first()
+    if not firm:
+        return None
+    current_app.config["_DEFAULT_FIRM_ID"] = firm.firm_id
+    return firm.firm_id
+
+
 # ─── Token validation ─────────────────────────────────────────────────────────
 
-def _validate_client_token(token: str):
+def _validate_client_token(token: str, load=()):
     """
-    Look up a client by portal_token.
+    Look up a client by the hash of its portal_token, eager-loading the named relationships.
     Returns the Client model instance if valid and not expired, else None.
     """
     try:
+        from sqlalchemy import or_
+        from sqlalchemy.orm import selectinload, raiseload
         from models import Client
-        client = Client.query.filter_by(portal_token=token).first()
-        if not client:
-            return None
-        # Check expiry
-        if client.token_expires_at:
-            if datetime.now(timezone.utc) > client.token_expires_at:
-                current_app.logger.info(f"Expired token used for client {client.reference_id}")
-                return None
-        return client
+        from utils.reference import hash_portal_token
+        options = [selectinload(getattr(Client, name)) for name in load]
+        # Outside production, any relationship the route didn't declare in
+        # load= raises instead of silently lazy-loading (catches N+1s early).
+        if current_app.config.get("ENV") != "production":
+            options.append(raiseload("*"))
+        # Expiry is part of the WHERE clause: an expired token matches no row,
+        # so it costs one query and never triggers the eager loads.
+        return (
+            Client.query
+            .filter(
+                Client.portal_token_hash == hash_portal_token(token),
+                or_(Client.token_expires_at.is_(None),
+                    Client.token_expires_at > datetime.now(timezone.utc)),
+            )
+            .options(*options)
+            .first()
+        )
     except Exception as e:
         current_app.logger.warning(f"Token validation error: {e}")
         return None
@@ -132,6 +132,19 @@ def run_conflict_check(client_id: str) -> dict:
     }
 
 
+def _record_summary(row) -> dict:
+    """
+    The matched ConflictIndex fields shown to admins, taken from the tier's
+    own query row so callers don't have to re-fetch the record.
+    """
+    return {
+        "record_id":        row.record_id,
+        "full_name":        row.full_name,
+        "case_type":        row.case_type,
+        "passport_numbers": row.passport_numbers or [],
+    }
+
+
 # ════════════════════════════════════════════════════════════
 #  Tier 1 — Exact ID match
 # ════════════════════════════════════════════════════════════
@@ -166,13 +179,14 @@ def _tier1_exact(payload: dict, firm_id: str) -> Optional[dict]:
                 "match_type":        MatchType.exact,
                 "confidence_score":  95.0,
                 "matched_record_id": row.record_id,
+                "matched_record":    _record_summary(row),
             }
 
     # Emirates ID exact match
     if emirates_id:
         row = db.session.execute(sql_text(
             """
-            SELECT record_id, full_name
+            SELECT record_id, full_name, case_type, passport_numbers
             FROM conflict_index
             WHERE firm_id = :firm_id
               AND emirates_id = :eid
@@ -186,6 +200,7 @@ def _tier1_exact(payload: dict, firm_id: str) -> Optional[dict]:
                 "match_type":        MatchType.exact,
                 "confidence_score":  90.0,
                 "matched_record_id": row.record_id,
+                "matched_record":    _record_summary(row),
             }
 
     return None
@@ -209,7 +224,8 @@ def _tier2_strong(payload: dict, firm_id: str) -> Optional[dict]:
 
     rows = db.session.execute(sql_text(
         """
-        SELECT record_id, full_name, nationality, case_type, opposing_party
+        SELECT record_id, full_name, nationality, case_type, opposing_party,
+               passport_numbers
         FROM conflict_index
         WHERE firm_id = :firm_id
         """
@@ -243,14 +259,15 @@ def _tier2_strong(payload: dict, firm_id: str) -> Optional[dict]:
 
         if score > best_score:
             best_score  = score
-            best_record = row.record_id
+            best_record = row
             logger.info(f"[Conflict T2] Name match '{row.full_name}' ratio={ratio:.2f} score={score}")
 
     if best_record:
         return {
             "match_type":        MatchType.strong,
             "confidence_score":  best_score,
-            "matched_record_id": best_record,
+            "matched_record_id": best_record.record_id,
+            "matched_record":    _record_summary(best_record),
         }
     return None
 
@@ -270,7 +287,7 @@ def _tier3_soft(embedding: list, firm_id: str) -> Optional[dict]:
     try:
         rows = db.session.execute(sql_text(
             """
-            SELECT record_id, full_name,
+            SELECT record_id, full_name, case_type, passport_numbers,
                    1 - (name_embedding <=> CAST(:vec AS vector)) AS similarity
             FROM conflict_index
             WHERE firm_id = :firm_id
@@ -302,6 +319,7 @@ def _tier3_soft(embedding: list, firm_id: str) -> Optional[dict]:
             "match_type":        MatchType.soft,
             "confidence_score":  score,
             "matched_record_id": row.record_id,
+            "matched_record":    _record_summary(row),
         }
 
     return None
@@ -316,6 +334,9 @@ def _build_payload(client: Client) -> dict:
     Build a conflict check payload for a client by collecting OCR
     output from all uploaded passports and Emirates IDs.
     Falls back to manual input (client.full_name) if OCR hasn't run.
+
+    Names come from the conflict_payload stored at OCR time; ocr_raw is
+    only read for rows OCR'd before that column existed.
     """
     passport_numbers = []
     nationalities    = []
@@ -328,8 +349,11 @@ def _build_payload(client: Client) -> dict:
             passport_numbers.append(p.passport_number)
         if p.nationality:
             nationalities.append(p.nationality)
-        if p.ocr_raw and p.ocr_raw.get("full_name") and not full_name:
-            full_name = p.ocr_raw["full_name"]
+        if not full_name:
+            if p.conflict_payload:
+                full_name = p.conflict_payload.get("full_name") or None
+            elif p.ocr_raw and p.ocr_raw.get("full_name"):
+                full_name = p.ocr_raw["full_name"]
 
     # Emirates ID
     for eid in client.emirates_ids:
@@ -186,6 +186,8 @@ def validate_payload(payload: dict) -> list:
     Validate a conflict check payload. Returns a list of error strings.
     Empty list means valid.
     """
+    if not isinstance(payload, dict):
+        return ["payload must be a JSON object."]
     errors = []
     if not payload.get("full_name"):
         errors.append("full_name is required.")
@@ -198,15 +200,19 @@ def validate_payload(payload: dict) -> list:
 
 # ─── Private helpers ──────────────────────────────────────────────────────────
 
+_WHITESPACE_RE    = re.compile(r"\s+")
+_ID_SEPARATORS_RE = re.compile(r"[\s\-]")
+
+
 def _clean_name(name: str) -> str:
     """Normalise a name: strip extra whitespace, title-case."""
     if not name:
         return ""
-    return re.sub(r"\s+", " ", name).strip()
+    return _WHITESPACE_RE.sub(" ", name).strip()
 
 
 def _clean_id(id_str: str) -> str:
     """Normalise an ID string: uppercase, strip spaces and dashes."""
     if not id_str:
         return ""
-    return re.sub(r"[\s\-]", "", str(id_str)).upper()
+    return _ID_SEPARATORS_RE.sub("", str(id_str)).upper()
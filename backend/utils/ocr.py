@@ -15,31 +15,134 @@ map directly to normalise_ocr_output() in utils/conflict_schema.py.
 import re
 import os
 import logging
+import threading
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Optional
 
+from utils.ocr_preprocess import prepare_for_ocr
+
 logger = logging.getLogger(__name__)
 
 # ── Lazy PaddleOCR instance ───────────────────────────────────────────────────
-_ocr_instance = None
+# One predictor per process, kept resident. gunicorn runs threaded workers, so
+# construction is double-checked under _ocr_init_lock (two first requests must
+# not both load the weights) and inference is serialised under _ocr_run_lock
+# (the Paddle predictor is not safe to call from several threads at once).
+_ocr_instance  = None
+_ocr_init_lock = threading.Lock()
+_ocr_run_lock  = threading.Lock()
+
+# OCR_BACKEND selects the inference runtime behind the same PaddleOCR pipeline:
+#   paddle    — PaddlePaddle (default)
+#   onnx      — ONNX Runtime on the INT8 det/rec/cls.onnx models that
+#               scripts/quantize_ocr_models.py writes into OCR_MODEL_DIR
+#   openvino  — as onnx, then the three sessions are swapped for OpenVINO
+#               compiled NNCF-INT8 IR models (*_int8.xml); VNNI on Intel CPUs.
+#               Falls back to ONNX Runtime if OpenVINO or the IR is missing.
+#   tensorrt  — GPU hosts (paddlepaddle-gpu): Paddle Inference's TensorRT
+#               engine at OCR_TRT_PRECISION. Inputs are letterboxed to one
+#               fixed square, so the detector always sees the same shape and
+#               the engine is built once; the tuned shape ranges are saved to
+#               OCR_MODEL_DIR/trt_shape_info.txt on first run and reused.
+# Pre/post-processing stays PaddleOCR's, so the returned text blocks (and all
+# field parsing below) are unchanged; only the inference runtime differs.
+OCR_BACKEND       = os.environ.get("OCR_BACKEND", "paddle").lower()
+OCR_MODEL_DIR     = os.environ.get("OCR_MODEL_DIR", "ocr_models")
+OCR_TRT_PRECISION = os.environ.get("OCR_TRT_PRECISION", "fp16").lower()   # fp32 | fp16 | int8
+OCR_DET_SIDE      = 960    # PaddleOCR's default detector side limit
+
+_active_backend = None     # what actually loaded — see ocr_backend()
+
+
+def _backend_kwargs() -> dict:
+    """Extra PaddleOCR arguments for the configured inference backend."""
+    if OCR_BACKEND in ("onnx", "openvino"):
+        return {
+            "use_onnx":      True,
+            "det_model_dir": os.path.join(OCR_MODEL_DIR, "det.onnx"),
+            "rec_model_dir": os.path.join(OCR_MODEL_DIR, "rec.onnx"),
+            "cls_model_dir": os.path.join(OCR_MODEL_DIR, "cls.onnx"),
+        }
+    if OCR_BACKEND == "tensorrt":
+        os.makedirs(OCR_MODEL_DIR, exist_ok=True)
+        return {
+            "use_gpu":             True,
+            "use_tensorrt":        True,
+            "precision":           OCR_TRT_PRECISION,
+            "det_limit_type":      "max",
+            "det_limit_side_len":  OCR_DET_SIDE,
+            "shape_info_filename": os.path.join(OCR_MODEL_DIR, "trt_shape_info.txt"),
+        }
+    return {}
 
-def _get_ocr():
-    """Lazily initialise PaddleOCR (heavy import, done only once)."""
-    global _ocr_instance
-    if _ocr_instance is None:
-        try:
-            from paddleocr import PaddleOCR  # noqa: F401
-            _ocr_instance = PaddleOCR(
-                use_angle_cls=True,
-                lang="en",
-                use_gpu=False,
-                show_log=False,
-                det_db_box_thresh=0.3,
+
+class _OpenVINOSession:
+    """The slice of onnxruntime.InferenceSession that PaddleOCR's predictors call."""
+
+    def __init__(self, compiled):
+        self._compiled = compiled
+
+    def run(self, output_names, input_dict):
+        result = self._compiled(list(input_dict.values()))
+        return [result[out] for out in self._compiled.outputs]
+
+
+def _attach_openvino(ocr) -> bool:
+    """Swap the ONNX Runtime sessions inside `ocr` for OpenVINO compiled models."""
+    try:
+        from openvino.runtime import Core
+        core  = Core()
+        swaps = []
+        for attr, name in (("text_detector", "det"), ("text_recognizer", "rec"),
+                           ("text_classifier", "cls")):
+            part = getattr(ocr, attr, None)
+            if part is None:
+                continue
+            compiled = core.compile_model(
+                os.path.join(OCR_MODEL_DIR, f"{name}_int8.xml"), "CPU",
+                {"PERFORMANCE_HINT": "LATENCY"},
             )
-            logger.info("PaddleOCR initialised.")
-        except ImportError:
-            logger.error("PaddleOCR not installed. Run: pip install paddleocr paddlepaddle")
-            raise
+            swaps.append((part, compiled))
+    except Exception as e:     # ImportError, missing IR, unsupported CPU, ...
+        logger.warning(f"OpenVINO OCR unavailable, using ONNX Runtime: {e}")
+        return False
+
+    for part, compiled in swaps:   # all compiled — swap together, never half
+        part.predictor    = _OpenVINOSession(compiled)
+        part.input_tensor = SimpleNamespace(name=compiled.inputs[0].any_name)
+    return True
+
+
+def ocr_backend() -> str:
+    """Inference runtime in use (the configured one until the model loads)."""
+    return _active_backend or OCR_BACKEND
+
+def _get_ocr():
+    """Lazily initialise PaddleOCR (heavy import, done only once per process)."""
+    global _ocr_instance, _active_backend
+    if _ocr_instance is not None:
+        return _ocr_instance
+    with _ocr_init_lock:
+        if _ocr_instance is None:
+            try:
+                from paddleocr import PaddleOCR  # noqa: F401
+                ocr = PaddleOCR(**{
+                    "use_angle_cls":     True,
+                    "lang":              "en",
+                    "use_gpu":           False,
+                    "show_log":          False,
+                    "det_db_box_thresh": 0.3,
+                    **_backend_kwargs(),
+                })
+                _active_backend = OCR_BACKEND
+                if OCR_BACKEND == "openvino" and not _attach_openvino(ocr):
+                    _active_backend = "onnx"
+                _ocr_instance = ocr
+                logger.info(f"PaddleOCR initialised ({_active_backend} runtime).")
+            except ImportError:
+                logger.error("PaddleOCR not installed. Run: pip install paddleocr paddlepaddle")
+                raise
     return _ocr_instance
 
 
@@ -47,19 +150,26 @@ def _get_ocr():
 #  Public API
 # ════════════════════════════════════════════════════════════
 
-def extract_text_blocks(file_path: str) -> list[str]:
+def extract_text_blocks(file_path) -> list[str]:
     """
     Run PaddleOCR on an image or PDF and return all detected text strings
     with confidence >= 0.5, in top-to-bottom order.
 
     Args:
-        file_path: Absolute path to the image or single-page PDF.
+        file_path: Absolute path to the image or single-page PDF, or an
+                   already decoded BGR array (see utils/ocr_preprocess.py).
+                   Paths are decoded and downscaled by prepare_for_ocr().
 
     Returns:
         List of text strings (no bounding box info).
     """
-    ocr = _get_ocr()
-    result = ocr.ocr(file_path, cls=True)
+    ocr   = _get_ocr()
+    if isinstance(file_path, str):
+        image = prepare_for_ocr(file_path, square=OCR_BACKEND == "tensorrt")
+    else:
+        image = file_path
+    with _ocr_run_lock:
+        result = ocr.ocr(image, cls=True)
 
     texts = []
     if result and result[0]:
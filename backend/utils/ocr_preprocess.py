@@ -0,0 +1,51 @@
+"""
+ocr_preprocess.py — Shrink ID images before they reach PaddleOCR.
+
+Phone photos of passports / Emirates IDs are often 4000×3000+. PaddleOCR's
+detector resizes to a 960 px side anyway, but it first decodes, normalises
+and crops text lines from the full-resolution array, so every stage moves
+~10× more bytes than the text needs. Decoding once here and downscaling to
+OCR_MAX_SIDE keeps MRZ / label text comfortably legible while cutting that
+work and the peak memory per OCR call.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+OCR_MAX_SIDE = 1280
+
+
+def prepare_for_ocr(path: str, max_side: int = OCR_MAX_SIDE, grayscale: bool = False,
+                    square: bool = False):
+    """
+    Read an image and downscale it so its longer side is at most max_side.
+
+    Returns a BGR uint8 array for PaddleOCR (grayscale is replicated back to
+    three channels), or the path unchanged when it cannot be decoded as an
+    image (PDFs, OpenCV missing) so PaddleOCR falls back to its own loader.
+
+    square=True letterboxes the result onto a black max_side × max_side
+    canvas (padding right / bottom, so text positions are unchanged). Every
+    image then has the same shape, which fixed-shape engines (TensorRT) need.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return path
+
+    img = cv2.imread(path, cv2.IMREAD_COLOR)
+    if img is None:
+        return path
+
+    h, w  = img.shape[:2]
+    scale = min(max_side / max(h, w), 1.0)
+    if scale < 1.0:
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if grayscale:
+        img = cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    if square:
+        h, w = img.shape[:2]
+        img  = cv2.copyMakeBorder(img, 0, max_side - h, 0, max_side - w,
+                                  cv2.BORDER_CONSTANT, value=(0, 0, 0))
+    return img
@@ -0,0 +1,66 @@
+"""
+rate_limit.py — Shared token bucket for outbound WhatsApp sends.
+
+Twilio queues (and past a point rejects with 429) WhatsApp messages sent
+faster than the sender's throughput, which defaults to 80 messages/second.
+Every send_whatsapp worker takes a token from one Redis bucket before
+calling Twilio, so bursts across all workers are smoothed to that rate
+instead of turning into 429s and retries.
+
+The bucket lives in a single Lua script, so refill and take are atomic
+across workers and use Redis' clock rather than each worker's.
+"""
+
+import os
+import logging
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+WHATSAPP_SEND_RATE = float(os.environ.get("WHATSAPP_SEND_RATE", 80))   # tokens / second
+WHATSAPP_BUCKET    = "wa:bucket"
+
+# KEYS[1] bucket; ARGV[1] rate/s, ARGV[2] capacity. Returns 0 when a token
+# was taken, else the milliseconds until one is available (nothing taken).
+_TAKE_TOKEN = """
+local rate, capacity = tonumber(ARGV[1]), tonumber(ARGV[2])
+local t   = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local b   = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or capacity
+local ts     = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+_script = None
+
+
+def take_whatsapp_token() -> float:
+    """
+    Take one send token. Returns 0.0 on success, otherwise the seconds to
+    wait before trying again.
+
+    Fails open (returns 0.0) when Redis is unavailable: a missing limiter
+    must not stop replies, Twilio's own queue still applies.
+    """
+    global _script
+    try:
+        if _script is None:
+            conn = get_redis()
+            if conn is None:
+                return 0.0
+            _script = conn.register_script(_TAKE_TOKEN)
+        return _script(keys=[WHATSAPP_BUCKET], args=[WHATSAPP_SEND_RATE, WHATSAPP_SEND_RATE]) / 1000.0
+    except Exception as exc:
+        logger.warning(f"[WA] Send rate limiter unavailable, sending unthrottled: {exc}")
+        return 0.0
@@ -0,0 +1,32 @@
+"""
+redis_client.py — The process-wide Redis connection for app-side helpers.
+
+Celery keeps its own broker / backend pools; this one serves small direct
+calls (the WhatsApp send bucket, webhook dedupe). redis-py's client is
+thread-safe and pools its connections, so one instance per process is
+shared by every gunicorn thread and created on first use, after any fork.
+"""
+
+import os
+import logging
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis():
+    """Return the shared Redis client, or None when redis-py is not installed."""
+    global _client
+    if _client is None and redis is not None:
+        _client = redis.Redis.from_url(
+            os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+            socket_timeout=1.0,
+            socket_connect_timeout=1.0,
+        )
+    return _client
@@ -3,8 +3,10 @@ reference.py — Reference ID and portal token generation.
 
 Reference ID format: ITF-YYYY-NNNNN (e.g. ITF-2026-04821)
 Portal token:        URL-safe random string, 32 bytes
+                     (looked up by its SHA-256, see hash_portal_token)
 """
 
+import hashlib
 import secrets
 import string
 from datetime import datetime, timezone, timedelta
@@ -60,6 +62,15 @@ def generate_portal_token() -> str:
     return secrets.token_urlsafe(36)  # 36 bytes → ~48 chars URL-safe
 
 
+def hash_portal_token(token: str) -> bytes:
+    """
+    SHA-256 digest of a portal token, stored in clients.portal_token_hash.
+    Token lookups probe this fixed 32-byte key instead of comparing the
+    secret itself in the database.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
 def token_expiry(days: int = 30):
     """Return a UTC datetime `days` from now."""
     return datetime.now(timezone.utc) + timedelta(days=days)
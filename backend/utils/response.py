@@ -3,6 +3,38 @@ response.py — Consistent JSON response helpers used across all routes.
 """
 
 from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional — Flask's stdlib-json provider is used instead
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson (C encoder), installed as app.json so every
+    jsonify / get_json goes through it. Datetimes are passed through to
+    Flask's default handler to keep their existing HTTP-date format.
+    """
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj) + b"\n", mimetype=self.mimetype)
+
+    def _dumps(self, obj) -> bytes:
+        option = self.option
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
 
 
 def success(data=None, message="OK", status_code=200):
@@ -0,0 +1,131 @@
+"""
+task_dispatcher.py — Publish Celery tasks off the request path.
+
+Routes call dispatch(task, *args) instead of task.delay(*args). That only puts
+the message on an in-process queue and returns a pre-assigned task id; a
+daemon thread drains the queue in small batches and publishes each batch
+through one pooled broker producer, so no broker round trip sits on the
+HTTP response.
+
+dispatch() still raises when the broker is unreachable, so routes keep
+their synchronous fallbacks: it probes the broker (result cached for
+HEALTH_TTL seconds) and a failed publish marks it down. Only tasks queued
+in the seconds between an outage starting and the next failed publish or
+probe are lost, and those are logged.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE     = 50       # max tasks published per producer checkout
+FLUSH_INTERVAL = 0.05     # seconds to wait for a batch to fill
+QUEUE_SIZE     = 10_000   # beyond this, dispatch() raises and callers degrade
+HEALTH_TTL     = 5.0      # seconds a broker probe (good or bad) is trusted
+
+_queue        = queue.Queue(maxsize=QUEUE_SIZE)
+_worker_lock  = threading.Lock()
+_worker_pid   = None
+_broker_state = (False, 0.0)   # (reachable, monotonic time the verdict expires)
+
+
+class BrokerUnavailable(RuntimeError):
+    """The Celery broker could not be reached; run the work another way."""
+
+
+def dispatch(task, *args) -> str:
+    """
+    Queue task(*args) for publishing and return its Celery task id.
+
+    Raises RuntimeError if the task is unavailable (Celery not installed),
+    BrokerUnavailable if the broker is down and queue.Full if the backlog is
+    saturated — callers wrap dispatch() in try/except and fall back.
+    """
+    if task is None:
+        raise RuntimeError("Celery task unavailable")
+    _check_broker(task.app)
+    _ensure_worker()
+    task_id = str(uuid.uuid4())
+    _queue.put_nowait((task, args, task_id))
+    return task_id
+
+
+def _check_broker(app):
+    """Raise BrokerUnavailable unless the broker answered within HEALTH_TTL."""
+    global _broker_state
+    ok, expires = _broker_state
+    if time.monotonic() >= expires:
+        try:
+            with app.connection_for_write() as conn:
+                conn.ensure_connection(max_retries=1, interval_start=0)
+            ok = True
+        except Exception as e:
+            logger.warning(f"Broker probe failed: {e}")
+            ok = False
+        _broker_state = (ok, time.monotonic() + HEALTH_TTL)
+    if not ok:
+        raise BrokerUnavailable("Celery broker unreachable")
+
+
+def _mark_broker_down():
+    global _broker_state
+    _broker_state = (False, time.monotonic() + HEALTH_TTL)
+
+
+def _ensure_worker():
+    """Start the publisher thread once per process (again after a fork)."""
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    with _worker_lock:
+        if _worker_pid != os.getpid():
+            threading.Thread(target=_run, name="task-dispatcher", daemon=True).start()
+            _worker_pid = os.getpid()
+
+
+def _run():
+    while True:
+        batch    = [_queue.get()]
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _publish(batch)
+
+
+def _publish(batch: list):
+    """Publish a batch over a single producer/connection from Celery's pool."""
+    try:
+        with batch[0][0].app.producer_or_acquire() as producer:
+            for task, args, task_id in batch:
+                try:
+                    task.apply_async(args, task_id=task_id, producer=producer)
+                except Exception as e:
+                    logger.warning(f"Could not publish {task.name} ({task_id}): {e}")
+    except Exception as e:
+        _mark_broker_down()     # later dispatch() calls raise, callers fall back
+        logger.warning(f"Broker unavailable — dropped {len(batch)} task(s): {e}")
+
+
+@atexit.register
+def _drain():
+    """Publish anything still queued when the process exits."""
+    batch = []
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _publish(batch)
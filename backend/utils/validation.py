@@ -0,0 +1,8 @@
+"""
+validation.py — Shared input shape checks for the intake channels.
+"""
+
+import re
+
+# Loose shape check: one "@", no whitespace, a dot in the domain
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
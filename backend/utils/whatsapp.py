@@ -0,0 +1,59 @@
+"""
+utils/whatsapp.py — Twilio WhatsApp sending.
+
+All outbound WhatsApp goes through `send_whatsapp_message()`. Credentials
+are passed in rather than read from current_app, so the same call works in
+a request (app config) and in a Celery worker, which has no app context
+(config.Config). Missing credentials make it a logged no-op.
+"""
+
+import functools
+import logging
+
+try:
+    from twilio.rest import Client as TwilioClient
+except ImportError:      # outbound WhatsApp is skipped (and logged) without it
+    TwilioClient = None
+
+log = logging.getLogger(__name__)
+
+
+def send_whatsapp_message(
+    to_number: str,
+    body: str,
+    sid: str,
+    token: str,
+    wa_from: str,
+    raise_errors: bool = False,
+) -> bool:
+    """
+    Send one WhatsApp message (to_number has the whatsapp: prefix).
+
+    Returns True on success, False when Twilio is not configured or the send
+    failed. Errors are logged and swallowed unless raise_errors is set.
+    """
+    if not all([sid, token, wa_from]):
+        log.warning(f"[WA] Twilio not configured — skipping send to {to_number}: {body[:60]}")
+        return False
+    if not wa_from.startswith("whatsapp:"):
+        wa_from = f"whatsapp:{wa_from}"
+    try:
+        twilio_client(sid, token).messages.create(from_=wa_from, to=to_number, body=body)
+        return True
+    except Exception as exc:
+        log.error(f"[WA] Failed to send message to {to_number}: {exc}")
+        if raise_errors:
+            raise
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def twilio_client(sid: str, token: str):
+    """
+    One Twilio REST client per process (per credentials). Its HTTP session
+    keeps the connection to api.twilio.com alive, so replies after the first
+    skip the TCP + TLS setup that a fresh client pays on every message.
+    """
+    if TwilioClient is None:
+        raise ImportError("twilio is not installed. Run: pip install twilio")
+    return TwilioClient(sid, token)
@@ -0,0 +1,10 @@
+"""
+wsgi.py — WSGI entry point for production servers.
+
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()
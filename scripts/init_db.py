@@ -6,6 +6,7 @@ Run this once to:
   2. Create all tables via SQLAlchemy
   3. Patch the conflict_index.name_embedding column to use the vector type
   4. Create the HNSW index for fast cosine similarity search
+  5. Add upload content-hash columns/indexes to databases created before them
 
 Usage:
     cd itifaq-onboarding
@@ -94,6 +95,124 @@ def create_vector_index(conn):
     cur.close()
 
 
+UPLOAD_HASH_TABLES = ("passports", "emirates_ids", "statements", "documents")
+
+
+def add_content_hash_columns(conn):
+    """
+    Add content_sha256 + the unique (client_id, content_sha256) index used for
+    upload dedup to tables created before those columns existed.
+    Idempotent — create_all() does not alter existing tables, so this does.
+    """
+    cur = conn.cursor()
+    for table in UPLOAD_HASH_TABLES:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64);")
+        cur.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_{table}_client_sha256
+            ON {table} (client_id, content_sha256);
+        """)
+    conn.commit()
+    cur.close()
+    print("[DB] Upload content-hash columns present.")
+
+
+def create_document_paging_index(conn):
+    """
+    (uploaded_at, document_id) index behind the keyset pagination in
+    GET /api/documents/. Idempotent.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_documents_uploaded_at_id
+        ON documents (uploaded_at, document_id);
+    """)
+    conn.commit()
+    cur.close()
+    print("[DB] Document paging index present.")
+
+
+def add_document_presence_columns(conn):
+    """
+    Add is_present / verified_at (maintained by tasks.verify_document_presence)
+    to a documents table created before those columns existed. Idempotent.
+    """
+    cur = conn.cursor()
+    cur.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS is_present BOOLEAN NOT NULL DEFAULT TRUE;")
+    cur.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP WITH TIME ZONE;")
+    conn.commit()
+    cur.close()
+    print("[DB] Document presence columns present.")
+
+
+def add_portal_token_hash(conn):
+    """
+    Add clients.portal_token_hash (SHA-256 of portal_token), backfill it,
+    and index it with client_id + token_expires_at INCLUDEd so token
+    ownership checks are index-only. Drops the older portal_token indexes
+    (the UNIQUE constraint on portal_token stays). Idempotent.
+    """
+    cur = conn.cursor()
+    cur.execute("ALTER TABLE clients ADD COLUMN IF NOT EXISTS portal_token_hash BYTEA;")
+    cur.execute("""
+        UPDATE clients SET portal_token_hash = sha256(convert_to(portal_token, 'UTF8'))
+        WHERE portal_token_hash IS NULL;
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_clients_portal_token_hash
+        ON clients (portal_token_hash) INCLUDE (client_id, token_expires_at);
+    """)
+    cur.execute("DROP INDEX IF EXISTS ix_clients_portal_token_covering;")
+    cur.execute("DROP INDEX IF EXISTS ix_clients_portal_token;")
+    conn.commit()
+    cur.close()
+    print("[DB] Portal token hash column and index present.")
+
+
+def add_conflict_payload_columns(conn):
+    """
+    Add conflict_payload (the normalised OCR payload stored next to ocr_raw)
+    to passports / emirates_ids created before it existed. Idempotent.
+    """
+    cur = conn.cursor()
+    for table in ("passports", "emirates_ids"):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS conflict_payload JSONB;")
+    conn.commit()
+    cur.close()
+    print("[DB] OCR conflict_payload columns present.")
+
+
+def create_statement_sequence_index(conn):
+    """
+    Index statements on (client_id, sequence_number, created_at) so the
+    WhatsApp confirm step finds a client's latest statement N with one
+    index seek. Idempotent.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_statements_client_seq
+        ON statements (client_id, sequence_number, created_at);
+    """)
+    conn.commit()
+    cur.close()
+    print("[DB] Statement sequence index present.")
+
+
+def create_client_phone_index(conn):
+    """
+    Index clients on (phone, channel) so each inbound WhatsApp message finds
+    its client with an index seek instead of scanning the table. Not unique:
+    web intakes may reuse a phone number. Idempotent.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_clients_phone_channel
+        ON clients (phone, channel);
+    """)
+    conn.commit()
+    cur.close()
+    print("[DB] Client phone index present.")
+
+
 def seed_demo_firm(conn):
     """
     Insert a default demo law firm and admin user if they don't exist.
@@ -159,6 +278,13 @@ def main():
         except Exception as e:
             conn.rollback()
             print(f"[DB] Skipping vector setup (pgvector not installed): {e}")
+        add_content_hash_columns(conn)
+        create_document_paging_index(conn)
+        add_document_presence_columns(conn)
+        add_portal_token_hash(conn)
+        add_conflict_payload_columns(conn)
+        create_statement_sequence_index(conn)
+        create_client_phone_index(conn)
         seed_demo_firm(conn)
     finally:
         conn.close()
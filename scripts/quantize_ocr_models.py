@@ -0,0 +1,122 @@
+"""
+quantize_ocr_models.py — Build the INT8 OCR models used by OCR_BACKEND=onnx|openvino.
+
+Run once (offline) per model upgrade. It takes the FP32 ONNX exports of the
+PaddleOCR detector, recogniser and angle classifier and writes:
+
+  --format onnx      det/rec/cls.onnx — dynamically quantised INT8 (weights as
+                     int8, activations quantised at run time) for ONNX Runtime.
+  --format openvino  det/rec/cls_int8.xml — OpenVINO IR statically quantised
+                     with NNCF (pip install openvino nncf) from a folder of
+                     sample scans, so INT8 kernels (VNNI) run end to end.
+                     OCR_BACKEND=openvino also needs the onnx models in the
+                     same folder: PaddleOCR builds its pipeline from them.
+
+1. Export the PaddleOCR inference models to ONNX with paddle2onnx
+   (pip install paddle2onnx), e.g. for the detector:
+
+    paddle2onnx --model_dir ~/.paddleocr/whl/det/en/en_PP-OCRv3_det_infer \\
+                --model_filename inference.pdmodel \\
+                --params_filename inference.pdiparams \\
+                --save_file ocr_models_fp32/det.onnx \\
+                --opset_version 11 --enable_onnx_checker True
+
+   and the same for rec/ (→ rec.onnx) and cls/ (→ cls.onnx).
+
+2. Quantise:
+
+    python scripts/quantize_ocr_models.py --src ocr_models_fp32 --out ocr_models
+    python scripts/quantize_ocr_models.py --src ocr_models_fp32 --out ocr_models \\
+                                          --format openvino --calib-dir samples/
+
+   Calibration uses whole passport / Emirates ID scans for all three models;
+   a few hundred images is plenty.
+
+3. Set OCR_BACKEND (onnx or openvino) and OCR_MODEL_DIR=ocr_models in .env.
+"""
+
+import os
+import sys
+import argparse
+
+MODELS = ("det", "rec", "cls")
+
+# Calibration input (H, W) per model; 960 is PaddleOCR's detector side limit
+CALIB_SHAPES = {"det": (960, 960), "rec": (48, 320), "cls": (48, 192)}
+
+
+def quantize(src_dir: str, out_dir: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name in MODELS:
+        src = os.path.join(src_dir, f"{name}.onnx")
+        dst = os.path.join(out_dir, f"{name}.onnx")
+        if not os.path.exists(src):
+            print(f"[OCR] Missing {src} — export it with paddle2onnx first.")
+            sys.exit(1)
+        quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+        print(f"[OCR] {name}: {os.path.getsize(src) // 1024} KB → {os.path.getsize(dst) // 1024} KB")
+
+
+def _calibration_inputs(calib_dir: str, name: str) -> list:
+    """Sample scans preprocessed the way PaddleOCR feeds each model (NCHW float32)."""
+    import cv2
+    import numpy as np
+
+    h, w = CALIB_SHAPES[name]
+    inputs = []
+    for fname in sorted(os.listdir(calib_dir)):
+        img = cv2.imread(os.path.join(calib_dir, fname))
+        if img is None:
+            continue
+        img = cv2.resize(img, (w, h)).astype("float32") / 255.0
+        if name == "det":
+            img = (img - [0.485, 0.456, 0.406]) / [0.229, 0.224, 0.225]
+        else:
+            img = (img - 0.5) / 0.5
+        inputs.append(img.transpose(2, 0, 1)[np.newaxis].astype("float32"))
+    return inputs
+
+
+def quantize_openvino(src_dir: str, out_dir: str, calib_dir: str):
+    import nncf
+    import openvino as ov
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name in MODELS:
+        src = os.path.join(src_dir, f"{name}.onnx")
+        dst = os.path.join(out_dir, f"{name}_int8.xml")
+        if not os.path.exists(src):
+            print(f"[OCR] Missing {src} — export it with paddle2onnx first.")
+            sys.exit(1)
+        samples = _calibration_inputs(calib_dir, name)
+        if not samples:
+            print(f"[OCR] No readable images in {calib_dir}.")
+            sys.exit(1)
+        model = ov.Core().read_model(src)
+        model = nncf.quantize(model, nncf.Dataset(samples), subset_size=len(samples))
+        ov.save_model(model, dst)
+        print(f"[OCR] {name}: INT8 IR written to {dst} ({len(samples)} calibration images)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantise PaddleOCR ONNX exports to INT8")
+    parser.add_argument("--src", required=True, help="Directory with FP32 det.onnx / rec.onnx / cls.onnx")
+    parser.add_argument("--out", default="ocr_models", help="Output directory (OCR_MODEL_DIR)")
+    parser.add_argument("--format", choices=("onnx", "openvino"), default="onnx",
+                        help="onnx: ORT dynamic INT8; openvino: NNCF static INT8 IR")
+    parser.add_argument("--calib-dir", help="Sample scans for --format openvino calibration")
+    args = parser.parse_args()
+
+    if args.format == "openvino":
+        if not args.calib_dir:
+            parser.error("--calib-dir is required for --format openvino")
+        quantize_openvino(args.src, args.out, args.calib_dir)
+    else:
+        quantize(args.src, args.out)
+    print(f"\nNext: set OCR_BACKEND={args.format} and OCR_MODEL_DIR in .env, then restart the app and workers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -119,3 +119,21 @@ def admin_client(app):
                 sess["role"]    = "admin"
                 sess["name"]    = "Test Admin"
         yield c
+
+
+@pytest.fixture
+def count_queries(app):
+    """Collect SQL statements executed while the fixture is active."""
+    from sqlalchemy import event
+    from database import db
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
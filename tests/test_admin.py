@@ -181,3 +181,20 @@ class TestAuditLog:
         assert data["ok"]
         for log in data["data"]["logs"]:
             assert log["record_type"] in ("client", None)
+
+    def test_repeated_audit_in_one_request_writes_one_row(self, app, firm_id):
+        import uuid
+        from database import db
+        from models import AuditLog
+        from routes.admin import _write_audit
+
+        record_id = str(uuid.uuid4())
+        with app.test_request_context():
+            _write_audit(firm_id, app._test_admin_id, "Test event", "client", record_id)
+            _write_audit(firm_id, app._test_admin_id, "Test event", "client", record_id)
+            db.session.commit()
+            rows = AuditLog.query.filter_by(record_id=record_id).all()
+            assert len(rows) == 1
+            for row in rows:
+                db.session.delete(row)
+            db.session.commit()
@@ -110,6 +110,93 @@ class TestClientUpload:
         # or fail gracefully if file is invalid
         assert r.status_code in (200, 201, 400, 422)
 
+    def test_concurrent_duplicate_upload_returns_first(self, client, new_client, app, monkeypatch):
+        """
+        Two retries that pass the dedupe SELECT together and target the same
+        file name: the loser gets the winner's row and the winner's file survives.
+        """
+        import os
+        import routes.client as client_routes
+        from models import Document
+        monkeypatch.setattr(client_routes, "make_document_filename", lambda *a, **k: "Raced_Document.pdf")
+        token = new_client["portal_token"]
+        post  = lambda: client.post(
+            f"/client/documents/upload?token={token}",
+            data={"file": (io.BytesIO(b"%PDF-1.4 raced"), "raced.pdf"), "document_type": "other"},
+            content_type="multipart/form-data",
+        )
+        first = post()
+        assert first.status_code in (200, 201)
+        document_id = first.get_json()["data"]["document_id"]
+        with app.app_context():
+            winner_path = Document.query.get(document_id).file_path
+        files_before = set(os.listdir(os.path.dirname(winner_path)))
+
+        monkeypatch.setattr(client_routes, "_find_duplicate_upload", lambda *a: None)
+        second = post()
+        assert second.status_code in (200, 201), second.data
+        assert second.get_json()["data"]["document_id"] == document_id
+        with open(winner_path, "rb") as f:
+            assert f.read() == b"%PDF-1.4 raced"
+        assert set(os.listdir(os.path.dirname(winner_path))) == files_before
+
+    def test_concurrent_duplicate_audio_keeps_winner_file(self, client, new_client, app, monkeypatch):
+        """Retried voice notes compute the same file name; losing must not delete the winner's audio."""
+        import os
+        import routes.client as client_routes
+        from models import Statement
+        monkeypatch.setattr(client_routes, "make_audio_filename", lambda *a: "stmt_raced.webm")
+        token = new_client["portal_token"]
+        post  = lambda: client.post(
+            f"/client/statement/audio?token={token}",
+            data={"audio_file": (io.BytesIO(b"OggS raced audio"), "note.webm")},
+            content_type="multipart/form-data",
+        )
+        first = post()
+        assert first.status_code in (200, 201), first.data
+        statement_id = first.get_json()["data"]["statement_id"]
+        with app.app_context():
+            winner_path = Statement.query.get(statement_id).raw_audio_path
+
+        monkeypatch.setattr(client_routes, "_find_duplicate_upload", lambda *a: None)
+        second = post()
+        assert second.status_code in (200, 201), second.data
+        assert second.get_json()["data"]["statement_id"] == statement_id
+        with open(winner_path, "rb") as f:
+            assert f.read() == b"OggS raced audio"
+        assert os.listdir(os.path.dirname(winner_path)) == [os.path.basename(winner_path)]
+
+        with app.app_context():     # leave the statement slots to the later tests
+            from database import db
+            db.session.delete(Statement.query.get(statement_id))
+            db.session.commit()
+        os.remove(winner_path)
+
+    def test_download_missing_file_returns_404(self, client, new_client, app):
+        """Admin download of a document whose file vanished → 404, flagged missing."""
+        token = new_client["portal_token"]
+        r = client.post(
+            f"/client/documents/upload?token={token}",
+            data={"file": (io.BytesIO(b"%PDF-1.4 vanishing"), "gone.pdf"), "document_type": "other"},
+            content_type="multipart/form-data",
+        )
+        assert r.status_code in (200, 201)
+        document_id = r.get_json()["data"]["document_id"]
+        with app.app_context():
+            import os
+            from models import Document
+            os.remove(Document.query.get(document_id).file_path)
+
+        admin_client = app.test_client()    # the shared fixture may be logged out by now
+        with admin_client.session_transaction() as sess:
+            sess["user_id"] = app._test_admin_id
+            sess["firm_id"] = app._test_firm_id
+            sess["role"]    = "admin"
+        r = admin_client.get(f"/api/documents/{document_id}/download")
+        assert r.status_code == 404
+        r = admin_client.get(f"/api/documents/{document_id}")
+        assert r.get_json()["data"]["file_exists"] is False
+
 
 class TestClientStatement:
     def test_statement_page(self, client, new_client, app):
@@ -142,6 +229,35 @@ class TestClientStatement:
             assert "ok" in data
 
 
+class TestClientPageQueries:
+    """Page routes declare their relationships on client_token_auth(load=...)."""
+
+    def test_statement_page_query_count(self, client, new_client, count_queries):
+        ref   = new_client["reference_id"]
+        token = new_client["portal_token"]
+        r = client.get(f"/client/{ref}/statement?token={token}")
+        assert r.status_code == 200
+        assert len(count_queries) <= 3, count_queries
+
+    def test_documents_page_query_count(self, client, new_client, count_queries):
+        ref   = new_client["reference_id"]
+        token = new_client["portal_token"]
+        r = client.get(f"/client/{ref}/documents?token={token}")
+        assert r.status_code == 200
+        assert len(count_queries) <= 3, count_queries
+
+    def test_undeclared_relationship_raises(self, app, new_client):
+        """Outside production, lazy-loading an undeclared relationship fails fast."""
+        from sqlalchemy.exc import InvalidRequestError
+        from utils.auth import _validate_client_token
+        token = new_client["portal_token"]
+        with app.test_request_context(f"/?token={token}"):
+            c = _validate_client_token(token)
+            assert c is not None
+            with pytest.raises(InvalidRequestError):
+                c.passports
+
+
 class TestKYC:
     def test_kyc_submit(self, client, new_client):
         token = new_client["portal_token"]
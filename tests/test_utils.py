@@ -63,6 +63,20 @@ class TestResponseUtils:
                 assert body["ok"] is False
                 assert r[1] == 404
 
+    def test_orjson_provider_matches_default_output(self):
+        pytest.importorskip("orjson")
+        from datetime import datetime, timezone
+        from flask import Flask, json
+        from utils.response import OrjsonProvider
+        plain = Flask(__name__)
+        fast  = Flask(__name__)
+        fast.json = OrjsonProvider(fast)
+        obj = {"when": datetime(2026, 1, 1, tzinfo=timezone.utc), "n": [1, 2]}
+        with plain.app_context():
+            expected = json.loads(json.dumps(obj))
+        with fast.app_context():
+            assert json.loads(json.dumps(obj)) == expected
+
 
 class TestOCRUtils:
     def test_extract_text_blocks_invalid_file(self):
@@ -93,6 +107,25 @@ class TestOCRUtils:
         result = _mrz_date("300101", is_birth=False)
         assert "2030" in result or "1930" not in result  # should be future
 
+    def test_prepare_for_ocr_downscales(self, tmp_path):
+        cv2 = pytest.importorskip("cv2")
+        import numpy as np
+        from utils.ocr_preprocess import prepare_for_ocr, OCR_MAX_SIDE
+        path = str(tmp_path / "scan.png")
+        cv2.imwrite(path, np.zeros((3000, 4000, 3), dtype=np.uint8))
+        assert max(prepare_for_ocr(path).shape[:2]) == OCR_MAX_SIDE
+        assert prepare_for_ocr("/nonexistent/scan.pdf") == "/nonexistent/scan.pdf"
+
+    def test_prepare_for_ocr_square_letterbox(self, tmp_path):
+        cv2 = pytest.importorskip("cv2")
+        import numpy as np
+        from utils.ocr_preprocess import prepare_for_ocr, OCR_MAX_SIDE
+        path = str(tmp_path / "card.png")
+        cv2.imwrite(path, np.full((400, 640, 3), 255, dtype=np.uint8))
+        img = prepare_for_ocr(path, square=True)
+        assert img.shape == (OCR_MAX_SIDE, OCR_MAX_SIDE, 3)
+        assert img[:400, :640].min() == 255 and img[400:].max() == 0
+
 
 class TestEmailUtils:
     def test_portal_link_email_template(self, app):
@@ -145,6 +178,94 @@ class TestEmailUtils:
             assert result is False  # API key is empty in test config
 
 
+class TestTaskDispatcher:
+    @staticmethod
+    def _fake_task(reachable: bool):
+        class Conn:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def ensure_connection(self, **kwargs):
+                if not reachable:
+                    raise ConnectionError("broker down")
+
+        class App:
+            def connection_for_write(self):
+                return Conn()
+
+        class Task:
+            app  = App()
+            name = "tasks.fake"
+        return Task()
+
+    @pytest.fixture
+    def dispatcher(self, monkeypatch):
+        import queue
+        import utils.task_dispatcher as td
+        monkeypatch.setattr(td, "_queue", queue.Queue())
+        monkeypatch.setattr(td, "_ensure_worker", lambda: None)
+        monkeypatch.setattr(td, "_broker_state", (False, 0.0))
+        return td
+
+    def test_dispatch_raises_when_broker_unreachable(self, dispatcher):
+        """Callers must be able to fall back instead of getting a PENDING-forever id."""
+        with pytest.raises(dispatcher.BrokerUnavailable):
+            dispatcher.dispatch(self._fake_task(reachable=False), "x")
+        assert dispatcher._queue.empty()
+
+    def test_dispatch_queues_when_broker_reachable(self, dispatcher):
+        task_id = dispatcher.dispatch(self._fake_task(reachable=True), "x")
+        assert dispatcher._queue.get_nowait()[2] == task_id
+
+    def test_failed_publish_marks_broker_down(self, dispatcher):
+        dispatcher._publish([(self._fake_task(reachable=True), (), "id-1")])   # no producer → fails
+        with pytest.raises(dispatcher.BrokerUnavailable):
+            dispatcher.dispatch(self._fake_task(reachable=True), "x")
+
+
+class TestWhatsAppUtils:
+    @pytest.fixture
+    def fake_twilio(self, monkeypatch):
+        import utils.whatsapp as wa
+        sent = []
+
+        class FakeTwilio:
+            def __init__(self, sid, token):
+                self.messages = self
+
+            def create(self, from_, to, body):
+                sent.append((from_, to, body))
+
+        monkeypatch.setattr(wa, "TwilioClient", FakeTwilio)
+        wa.twilio_client.cache_clear()
+        yield sent
+        wa.twilio_client.cache_clear()
+
+    def test_send_whatsapp_not_configured(self):
+        from utils.whatsapp import send_whatsapp_message
+        assert send_whatsapp_message("whatsapp:+971500000000", "Hi", "", "", "") is False
+
+    def test_send_whatsapp_message(self, fake_twilio):
+        from utils.whatsapp import send_whatsapp_message
+        assert send_whatsapp_message("whatsapp:+971500000000", "Hi", "AC1", "tok", "+14155238886")
+        assert fake_twilio == [("whatsapp:+14155238886", "whatsapp:+971500000000", "Hi")]
+
+    def test_send_whatsapp_task_without_app_context(self, fake_twilio, monkeypatch):
+        """The Celery task must not depend on current_app (workers have none)."""
+        pytest.importorskip("celery")
+        from config import Config
+        from tasks.notifications import send_whatsapp
+        monkeypatch.setattr(Config, "TWILIO_ACCOUNT_SID", "AC1")
+        monkeypatch.setattr(Config, "TWILIO_AUTH_TOKEN", "tok")
+        monkeypatch.setattr(Config, "TWILIO_WHATSAPP_NUMBER", "whatsapp:+14155238886")
+        monkeypatch.setattr("utils.rate_limit.take_whatsapp_token", lambda: 0.0)
+        send_whatsapp.run("whatsapp:+971500000000", ["one", "two"])
+        assert [body for _, _, body in fake_twilio] == ["one", "two"]
+
+
 class TestPDFUtils:
     def test_generate_engagement_letter(self, app, tmp_path):
         """Generate a PDF and verify the file was created."""